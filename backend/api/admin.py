@@ -1,7 +1,12 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import AddIngredientInRec, Ingredients, Recipe, Tag
+from .cache import invalidate_recipe_shopping_lists
+from .feed import fan_out
+from .images import schedule_variants
+from .models import AddIngredientInRec, Ingredients, Recipe, Tag, User
+from .search import update_search_vectors
+from .services import update_counter
 
 
 @admin.register(Tag)
@@ -26,11 +31,35 @@ class IngredientAdmin(admin.ModelAdmin):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('author', 'name', 'image_tag')
+    list_display = ('author', 'name', 'image_tag', 'favorites_count')
     search_fields = ('user', 'author')
     list_filter = ('author', 'name', 'tags')
     inlines = [RecipeIngredientInLine]
-    readonly_fields = ('image_tag',)
+    readonly_fields = (
+        'image_tag', 'favorites_count', 'in_carts_count', 'ingredients_count'
+    )
+
+    def save_model(self, request, obj, form, change):
+        if 'image' in form.changed_data:
+            obj.image_variants = {}
+        super().save_model(request, obj, form, change)
+        if change and 'author' in form.changed_data:
+            update_counter(
+                User, form.initial['author'], 'recipes_count', -1
+            )
+            update_counter(User, obj.author_id, 'recipes_count', 1)
+        if 'image' in form.changed_data:
+            schedule_variants(obj)
+        if not change:
+            fan_out(obj)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        Recipe.objects.filter(pk=form.instance.pk).update(
+            ingredients_count=form.instance.amounts.count()
+        )
+        invalidate_recipe_shopping_lists([form.instance.pk])
+        update_search_vectors([form.instance.pk])
 
     def image_tag(self, instance):
         return format_html(
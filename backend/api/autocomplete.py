@@ -0,0 +1,74 @@
+import threading
+from bisect import bisect_left
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+import api.constants as c
+
+from .models import Ingredients
+
+
+class IngredientIndex:
+    """Sorted in-process index of ingredient names.
+
+    Used instead of the trigram and pattern indexes on databases other
+    than PostgreSQL. Built on first use and dropped by the Ingredients
+    signals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def invalidate(self):
+        self._entries = None
+
+    def _load(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = sorted(
+                    (name.lower(), pk)
+                    for name, pk in Ingredients.objects.values_list(
+                        'name', 'pk'
+                    )
+                )
+            return self._entries
+
+    def search(self, query, limit):
+        """Return ids of names starting with, then containing, ``query``."""
+        entries = self._load()
+        query = query.lower()
+        ids = []
+        start = bisect_left(entries, (query,))
+        for name, pk in entries[start:]:
+            if len(ids) == limit or not name.startswith(query):
+                break
+            ids.append(pk)
+        for name, pk in entries:
+            if len(ids) == limit:
+                break
+            if query in name and not name.startswith(query):
+                ids.append(pk)
+        return ids
+
+
+ingredient_index = IngredientIndex()
+
+
+def search_ingredients(queryset, query, limit=c.AUTOCOMPLETE_LIMIT):
+    """Ingredients matching ``query``, prefix matches first, capped."""
+    if connection.vendor == 'postgresql':
+        return queryset.filter(name__icontains=query).annotate(
+            substring_match=Case(
+                When(name__istartswith=query, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by('substring_match', 'name')[:limit]
+    ids = ingredient_index.search(query, limit)
+    return queryset.filter(pk__in=ids).order_by(Case(
+        *(When(pk=pk, then=Value(position))
+          for position, pk in enumerate(ids)),
+        output_field=IntegerField(),
+    ))
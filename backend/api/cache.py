@@ -0,0 +1,95 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+import api.constants as c
+
+from .models import ShoppingList
+from .services import get_shopping_list
+
+
+def _shopping_list_version_key(user_id):
+    return f'shopping_list:version:{user_id}'
+
+
+def get_shopping_list_version(user_id):
+    """Return the time of the last change to the user's shopping list.
+
+    The value is used both as the cache version of rendered documents
+    and as their Last-Modified date.
+    """
+    key = _shopping_list_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_shopping_list_version(*user_ids):
+    now = time.time()
+    cache.set_many(
+        {_shopping_list_version_key(user_id): now for user_id in user_ids},
+        None
+    )
+
+
+def invalidate_recipe_shopping_lists(recipe_ids):
+    """Bump the version of every user who has one of the recipes."""
+    bump_shopping_list_version(*set(
+        ShoppingList.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('user_id', flat=True)
+    ))
+
+
+def get_shopping_list_document(user, renderer, version):
+    """Render the shopping list with ``renderer``, reusing the cache."""
+    key = f'shopping_list:{user.pk}:{version}:{renderer.format}'
+    content = cache.get(key)
+    if content is None:
+        content = renderer.render_shopping_list(get_shopping_list(user))
+        cache.set(key, content, c.SHOPPING_LIST_CACHE_TIMEOUT)
+    return content
+
+
+def _catalog_version_key(key):
+    return f'{key}:version'
+
+
+def _bump_version(version_key):
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.add(version_key, 1, None)
+
+
+def get_catalog(key, build):
+    """Return the cached ``(content, etag)`` pair, building it on a miss.
+
+    Entries are stored under the catalog's current version. A build
+    that races with an invalidation lands under the old version and is
+    never served, and every entry expires after CATALOG_CACHE_TIMEOUT.
+    """
+    version = cache.get(_catalog_version_key(key), 0)
+    entry = cache.get(key, version=version)
+    if entry is None:
+        content = build()
+        entry = (content, quote_etag(hashlib.md5(content).hexdigest()))
+        cache.set(key, entry, c.CATALOG_CACHE_TIMEOUT, version=version)
+    return entry
+
+
+def invalidate_catalog(key):
+    _bump_version(_catalog_version_key(key))
+
+
+def get_page_count_version():
+    """Return the cache version of paginated list counts."""
+    return cache.get(c.PAGE_COUNT_VERSION_KEY, 0)
+
+
+def invalidate_page_counts():
+    _bump_version(c.PAGE_COUNT_VERSION_KEY)
@@ -13,3 +13,51 @@ Y1 = 710
 X2 = 565
 Y2 = 710
 Y_FOR_INGREDIENTS = 670
+Y_PAGE_TOP = 800
+Y_PAGE_BOTTOM = 50
+X_FOR_INGREDIENTS = 50
+LINE_HEIGHT = 25
+
+FONT_NAME = 'Dej'
+FONT_FILE = 'DejaVuSans.ttf'
+FALLBACK_FONT_NAME = 'Helvetica'
+
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+
+AUTOCOMPLETE_LIMIT = 20
+
+TAGS_CACHE_KEY = 'catalog:tags'
+INGREDIENTS_CACHE_KEY = 'catalog:ingredients'
+CATALOG_MAX_AGE = 60
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+PAGE_COUNT_CACHE_TIMEOUT = 30
+PAGE_COUNT_VERSION_KEY = 'page_count:version'
+
+RANKING_HALF_LIFE = 7 * 24 * 60 * 60
+RANKING_FAVORITE_WEIGHT = 2.0
+RANKING_CART_WEIGHT = 1.0
+RANKING_BATCH_SIZE = 1000
+# Events younger than this may belong to transactions still running, so
+# a run only counts events up to this long before it.
+RANKING_SETTLE_TIME = 5 * 60
+
+FEED_BATCH_SIZE = 1000
+FEED_BACKFILL_LIMIT = 100
+
+SEARCH_CONFIG = 'russian'
+SEARCH_FALLBACK_LIMIT = 1000
+
+IMAGE_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_DECODE_CHUNK_SIZE = 64 * 1024
+IMAGE_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+IMAGE_VARIANTS = {'small': (320, 320), 'medium': (960, 960)}
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANTS_DIR = 'image/variants'
+IMAGE_WORKERS = 2
+MEDIA_GC_GRACE_PERIOD = 60 * 60
+
+BATCH_MAX_SIZE = 100
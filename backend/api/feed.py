@@ -0,0 +1,39 @@
+import api.constants as c
+
+from .models import FeedItem, Follow, Recipe
+
+
+def fan_out(recipe):
+    """Deliver a new recipe to the feed of every follower of its author."""
+    followers = Follow.objects.filter(
+        author_id=recipe.author_id
+    ).values_list('user_id', flat=True)
+    FeedItem.objects.bulk_create(
+        (
+            FeedItem(user_id=user_id, recipe=recipe,
+                     author_id=recipe.author_id)
+            for user_id in followers.iterator()
+        ),
+        batch_size=c.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user, author):
+    """Seed a new subscription with the author's latest recipes."""
+    recipes = Recipe.objects.filter(author=author).order_by(
+        '-id'
+    ).values_list('id', flat=True)[:c.FEED_BACKFILL_LIMIT]
+    FeedItem.objects.bulk_create(
+        (
+            FeedItem(user=user, recipe_id=recipe_id, author=author)
+            for recipe_id in recipes
+        ),
+        batch_size=c.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def trim(user, author):
+    """Drop an unfollowed author's recipes from the user's feed."""
+    FeedItem.objects.filter(user=user, author=author).delete()
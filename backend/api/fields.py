@@ -1,30 +1,50 @@
-import base64
-import imghdr
 import uuid
 
 import six
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from .images import ImageError, decode_base64, get_image_extension
+from .models import Recipe
+
 
 class Base64ImageField(serializers.ImageField):
+    default_error_messages = {
+        'too_large': 'Image is too large.',
+    }
 
     def to_internal_value(self, data):
         if isinstance(data, six.string_types):
             if 'data:' in data and ';base64,' in data:
                 header, data = data.split(';base64,')
             try:
-                decoded_file = base64.b64decode(data)
-            except TypeError:
-                self.fail('invalid_image')
+                decoded_file = decode_base64(data)
+                file_extension = get_image_extension(decoded_file)
+            except ImageError as error:
+                self.fail(str(error))
             file = str(uuid.uuid4())[:12]
-            file_extension = self.get_file_extension(file, decoded_file)
             complete_file_name = '%s.%s' % (file, file_extension, )
             data = ContentFile(decoded_file, name=complete_file_name)
         return super().to_internal_value(data)
 
-    def get_file_extension(self, file, decoded_file):
-        extension = imghdr.what(file, decoded_file)
-        if extension == 'jpeg':
-            extension = 'jpg'
-        return extension
+
+def get_image_variant_urls(variants, request=None):
+    storage = Recipe._meta.get_field('image').storage
+    urls = {}
+    for variant, name in (variants or {}).items():
+        url = storage.url(name)
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        urls[variant] = url
+    return urls
+
+
+class ImageVariantsField(serializers.Field):
+    """Absolute URLs of the downscaled copies of a recipe image."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return get_image_variant_urls(value, self.context.get('request'))
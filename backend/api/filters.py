@@ -1,54 +1,93 @@
-from django_filters import CharFilter, FilterSet
+from django.db.models import Exists, FloatField, OuterRef, Value
+from django.db.models.functions import Coalesce
+from django_filters import CharFilter, ChoiceFilter, FilterSet
 from django_filters.filters import BooleanFilter
+from django_filters.widgets import BooleanWidget
 
-from .models import Ingredients, Recipe
+from .autocomplete import search_ingredients
+from .models import FavoriteRecipe, Ingredients, Recipe, ShoppingList
+from .search import search_recipes
+
+TAGS_MODE_ALL = 'all'
+ORDERING_POPULAR = 'popular'
+ORDERING_FAVORITES = 'favorites'
+ORDERING_CHOICES = (
+    (ORDERING_POPULAR, 'Popular this week'),
+    (ORDERING_FAVORITES, 'Most favorited'),
+)
 
 
 class RecipeFilter(FilterSet):
+    """Filters are Exists() subqueries, so no join or DISTINCT is added.
+
+    ``tags`` matches recipes with any of the given slugs, or with every
+    one of them when ``tags_mode=all`` is passed. ``ordering=popular``
+    sorts by the precomputed ranking, ``ordering=favorites`` by the
+    favorites counter. ``search`` runs a full-text query over the name,
+    ingredients and text and orders the results by relevance.
+    """
     tags = CharFilter(field_name='tags__slug', method='filter_tags')
-    is_favorited = BooleanFilter(method='filter_is_favorited')
-    is_in_shopping_cart = BooleanFilter(method='filter_is_in_shopping_cart')
+    is_favorited = BooleanFilter(
+        method='filter_is_favorited', widget=BooleanWidget()
+    )
+    is_in_shopping_cart = BooleanFilter(
+        method='filter_is_in_shopping_cart', widget=BooleanWidget()
+    )
+    ordering = ChoiceFilter(choices=ORDERING_CHOICES, method='filter_ordering')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
         fields = ('is_favorited', 'is_in_shopping_cart', 'author', 'tags')
 
-    def filter_tags(self, queryset, slug, tags):
-        tags = self.request.query_params.getlist('tags')
-        return queryset.filter(
-            tags__slug__in=tags
-        ).distinct()
+    def filter_tags(self, queryset, name, value):
+        tags = set(self.request.query_params.getlist('tags'))
+        recipe_tags = Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk')
+        )
+        if self.request.query_params.get('tags_mode') == TAGS_MODE_ALL:
+            for tag in tags:
+                queryset = queryset.filter(
+                    Exists(recipe_tags.filter(tag__slug=tag))
+                )
+            return queryset
+        return queryset.filter(Exists(recipe_tags.filter(tag__slug__in=tags)))
 
-    def filter_is_favorited(self, queryset, is_favorited, slug):
+    def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
-        if not user.is_authenticated:
+        if not user.is_authenticated or not value:
             return queryset
-        is_favorited = self.request.query_params.get(
-            'is_favorited',
-        )
-        if is_favorited:
-            return queryset.filter(
-                is_favorited__user=self.request.user
-            ).distinct()
-        return queryset
+        return queryset.filter(Exists(FavoriteRecipe.objects.filter(
+            user=user, recipe=OuterRef('pk')
+        )))
 
-    def filter_is_in_shopping_cart(self, queryset, is_in_shopping_cart, slug):
+    def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
-        if not user.is_authenticated:
+        if not user.is_authenticated or not value:
             return queryset
-        is_in_shopping_cart = self.request.query_params.get(
-            'is_in_shopping_cart',
-        )
-        if is_in_shopping_cart:
-            return queryset.filter(
-                is_in_shopping_cart__user=self.request.user
-            ).distinct()
-        return queryset
+        return queryset.filter(Exists(ShoppingList.objects.filter(
+            user=user, recipe=OuterRef('pk')
+        )))
+
+    def filter_ordering(self, queryset, name, value):
+        if value == ORDERING_POPULAR:
+            return queryset.annotate(
+                popularity=Coalesce(
+                    'ranking__score', Value(0.0), output_field=FloatField()
+                )
+            ).order_by('-popularity', '-id')
+        return queryset.order_by('-favorites_count', '-id')
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
 
 
 class IngredientNameFilter(FilterSet):
-    name = CharFilter(field_name='name', lookup_expr='icontains')
+    name = CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredients
         fields = ('name',)
+
+    def filter_name(self, queryset, name, value):
+        return search_ingredients(queryset, value)
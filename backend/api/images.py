@@ -0,0 +1,143 @@
+import base64
+import binascii
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, features
+
+import api.constants as c
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+if features.check('webp'):
+    VARIANT_FORMAT, VARIANT_EXTENSION = 'WEBP', 'webp'
+else:
+    VARIANT_FORMAT, VARIANT_EXTENSION = 'JPEG', 'jpg'
+
+_executor = None
+
+
+class ImageError(ValueError):
+    pass
+
+
+def decode_base64(data, max_size=None):
+    """Decode base64 text chunk by chunk, stopping once it gets too large.
+
+    Whitespace is dropped per chunk and an incomplete quartet is carried
+    over to the next one, so at most one chunk past ``max_size`` is ever
+    decoded.
+    """
+    if max_size is None:
+        max_size = c.IMAGE_MAX_SIZE
+    chunk_size = c.IMAGE_DECODE_CHUNK_SIZE
+    decoded = BytesIO()
+    pending = ''
+    try:
+        for start in range(0, len(data), chunk_size):
+            pending += ''.join(data[start:start + chunk_size].split())
+            complete = len(pending) // 4 * 4
+            decoded.write(
+                base64.b64decode(pending[:complete], validate=True)
+            )
+            pending = pending[complete:]
+            if decoded.tell() > max_size:
+                break
+        else:
+            decoded.write(base64.b64decode(pending, validate=True))
+    except (binascii.Error, ValueError):
+        raise ImageError('invalid_image')
+    if decoded.tell() > max_size:
+        raise ImageError('too_large')
+    return decoded.getvalue()
+
+
+def get_image_extension(content):
+    """Check ``content`` with Pillow and return the file extension."""
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image_format = image.format
+            image.verify()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise ImageError('invalid_image')
+    if image_format not in c.IMAGE_FORMATS:
+        raise ImageError('invalid_image')
+    return c.IMAGE_FORMATS[image_format]
+
+
+def variant_path(image_name, variant):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'{c.IMAGE_VARIANTS_DIR}/{stem}_{variant}.{VARIANT_EXTENSION}'
+
+
+def generate_variants(recipe_id, image_name):
+    """Write downscaled copies of a recipe image and record them.
+
+    Copies already on disk are reused, since image names are content
+    hashes and the same picture always yields the same copies. The
+    recipe is only updated if it still points at ``image_name``, so a
+    late worker cannot overwrite the variants of a newer upload.
+    """
+    variants = {
+        variant: variant_path(image_name, variant)
+        for variant in c.IMAGE_VARIANTS
+    }
+    missing = [
+        variant for variant, path in variants.items()
+        if not default_storage.exists(path)
+    ]
+    if missing:
+        storage = Recipe._meta.get_field('image').storage
+        with storage.open(image_name) as source:
+            image = Image.open(source)
+            image.load()
+        if VARIANT_FORMAT == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+    for variant in missing:
+        size = c.IMAGE_VARIANTS[variant]
+        resized = image.copy()
+        resized.thumbnail(size)
+        buffer = BytesIO()
+        resized.save(
+            buffer, VARIANT_FORMAT, quality=c.IMAGE_VARIANT_QUALITY
+        )
+        variants[variant] = default_storage.save(
+            variants[variant], ContentFile(buffer.getvalue())
+        )
+    Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        image_variants=variants
+    )
+    return variants
+
+
+def _run_generate_variants(recipe_id, image_name):
+    try:
+        generate_variants(recipe_id, image_name)
+    except Exception:
+        logger.exception('Could not build variants of %s', image_name)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=c.IMAGE_WORKERS, thread_name_prefix='images'
+        )
+    return _executor
+
+
+def schedule_variants(recipe):
+    """Build the variants in a worker thread once the upload is committed."""
+    recipe_id, image_name = recipe.pk, recipe.image.name
+    transaction.on_commit(lambda: get_executor().submit(
+        _run_generate_variants, recipe_id, image_name
+    ))
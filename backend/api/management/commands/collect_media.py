@@ -0,0 +1,56 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+import api.constants as c
+from api.models import Recipe
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = 'Delete recipe images and image copies no recipe refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the files that would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        storage = Recipe._meta.get_field('image').storage
+        upload_to = Recipe._meta.get_field('image').upload_to.rstrip('/')
+        referenced = set()
+        for image, variants in Recipe.objects.values_list(
+            'image', 'image_variants'
+        ).iterator():
+            referenced.add(image)
+            referenced.update((variants or {}).values())
+        # Skip fresh files, which may belong to an upload still in flight.
+        cutoff = timezone.now() - timedelta(
+            seconds=c.MEDIA_GC_GRACE_PERIOD
+        )
+        deleted = 0
+        if not storage.exists(upload_to):
+            return
+        for path in walk(storage, upload_to):
+            if path in referenced:
+                continue
+            if storage.get_modified_time(path) > cutoff:
+                continue
+            if options['dry_run']:
+                self.stdout.write(path)
+            else:
+                storage.delete(path)
+            deleted += 1
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} files'))
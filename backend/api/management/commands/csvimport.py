@@ -1,21 +1,157 @@
+import csv
 import json
+import time
+from itertools import islice
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 from foodgram.settings import BASE_DIR
+from api.autocomplete import ingredient_index
+from api.cache import invalidate_catalog
 from api.models import Ingredients
+import api.constants as c
 
+JSON_SEPARATORS = ' \t\r\n,[]'
 
-class Command(BaseCommand):
-    help = 'Add new ingredients model from ingredients.json'
 
-    def handle(self, *args, **options):
-        with open(BASE_DIR / 'data/ingredients.json') as file:
-            data = json.load(file)
-            Ingredients.objects.bulk_create(
-                Ingredients(
-                    name=row['name'],
-                    measurement_unit=row['measurement_unit']
+def iter_csv(file):
+    reader = csv.reader(file)
+    for row in reader:
+        if row:
+            if len(row) != 2:
+                raise CommandError(
+                    f'Line {reader.line_num}: expected 2 columns '
+                    f'(name, measurement_unit), got {len(row)}'
+                )
+            name, measurement_unit = row
+            yield {'name': name, 'measurement_unit': measurement_unit}
+
+
+def iter_json_lines(file):
+    for line_number, line in enumerate(file, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(
+                    f'Line {line_number}: invalid JSON: {error}'
                 )
-                for row in data
+
+
+def iter_json_array(file, chunk_size=c.IMPORT_CHUNK_SIZE):
+    """Yield the objects of a top-level JSON array one at a time.
+
+    The file is read in chunks, so memory use does not depend on the
+    size of the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    while not eof:
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        position = 0
+        while True:
+            while (
+                position < len(buffer)
+                and buffer[position] in JSON_SEPARATORS
+            ):
+                position += 1
+            if position == len(buffer):
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if eof:
+                    raise CommandError(f'Invalid JSON: {error}')
+                break
+            # A number or literal may go on in the next chunk, so an
+            # item only counts once the delimiter after it has arrived.
+            if not eof and (
+                end == len(buffer) or buffer[end] not in JSON_SEPARATORS
+            ):
+                break
+            position = end
+            yield item
+        buffer = buffer[position:]
+
+
+def iter_ingredients(rows):
+    for number, row in enumerate(rows, 1):
+        try:
+            yield Ingredients(
+                name=row['name'].strip(),
+                measurement_unit=row['measurement_unit'].strip(),
             )
+        except (AttributeError, KeyError, TypeError):
+            raise CommandError(
+                f'Row {number}: expected name and measurement_unit '
+                f'strings, got {row!r}'
+            )
+
+
+READERS = {
+    'csv': iter_csv,
+    'json': iter_json_array,
+    'jsonl': iter_json_lines,
+}
+
+
+class Command(BaseCommand):
+    help = 'Import ingredients from a CSV, JSON or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=BASE_DIR / 'data/ingredients.json',
+            type=Path,
+        )
+        parser.add_argument(
+            '--format',
+            choices=READERS,
+            help='File format, guessed from the extension by default',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=c.IMPORT_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.')
+        if file_format not in READERS:
+            raise CommandError(f'Unknown file format: {file_format}')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+        initial_count = Ingredients.objects.count()
+        processed = 0
+        started = time.monotonic()
+        try:
+            with open(path, encoding='utf-8', newline='') as file:
+                rows = iter_ingredients(READERS[file_format](file))
+                while True:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    Ingredients.objects.bulk_create(
+                        batch, ignore_conflicts=True
+                    )
+                    processed += len(batch)
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f'{processed} rows processed, '
+                        f'{processed / elapsed:.0f} rows/s'
+                    )
+        finally:
+            # Batches written before a failure must show up as well.
+            ingredient_index.invalidate()
+            invalidate_catalog(c.INGREDIENTS_CACHE_KEY)
+        created = Ingredients.objects.count() - initial_count
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {processed} rows processed, {created} ingredients added'
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from api.images import generate_variants
+from api.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Build the downscaled image copies for recipes lacking them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild the copies of every recipe',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(image_variants={})
+        built = 0
+        for recipe_id, image_name in recipes.values_list(
+            'pk', 'image'
+        ).iterator():
+            try:
+                generate_variants(recipe_id, image_name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{image_name}: {error}')
+                continue
+            built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Built image copies for {built} recipes'
+        ))
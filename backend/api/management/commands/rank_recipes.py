@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.ranking import rebuild_ranking, refresh_ranking
+
+
+class Command(BaseCommand):
+    help = 'Refresh the recipe popularity ranking'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only process events since the previous run',
+        )
+
+    def handle(self, *args, **options):
+        if options['incremental']:
+            updated = refresh_ranking()
+        else:
+            updated = rebuild_ranking()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ranking updated for {updated} recipes'
+        ))
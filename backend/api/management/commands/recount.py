@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from api.models import (AddIngredientInRec, FavoriteRecipe, Follow, Recipe,
+                        ShoppingList, User)
+
+
+def count_of(queryset, field):
+    """Subquery counting rows of ``queryset`` that point at the outer row."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(total=Count('pk')).values('total')
+        ),
+        Value(0),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the denormalised recipe and user counters'
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.update(
+            favorites_count=count_of(FavoriteRecipe.objects, 'recipe'),
+            in_carts_count=count_of(ShoppingList.objects, 'recipe'),
+            ingredients_count=count_of(AddIngredientInRec.objects, 'recipe'),
+        )
+        users = User.objects.update(
+            recipes_count=count_of(Recipe.objects, 'author'),
+            followers_count=count_of(Follow.objects, 'author'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted {recipes} recipes and {users} users'
+        ))
@@ -0,0 +1,38 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Django looks ingredients up with UPPER("name"::text) LIKE UPPER(...),
+# so both indexes are built on that expression.
+CREATE_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS api_ingredients_name_prefix_idx '
+    'ON api_ingredients (UPPER(name::text) text_pattern_ops)',
+    'CREATE INDEX IF NOT EXISTS api_ingredients_name_trgm_idx '
+    'ON api_ingredients USING gin (UPPER(name::text) gin_trgm_ops)',
+)
+DROP_INDEXES = (
+    'DROP INDEX IF EXISTS api_ingredients_name_prefix_idx',
+    'DROP INDEX IF EXISTS api_ingredients_name_trgm_idx',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_auto_20230815_1311'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            run_postgresql(CREATE_INDEXES), run_postgresql(DROP_INDEXES)
+        ),
+    ]
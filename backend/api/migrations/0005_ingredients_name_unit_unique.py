@@ -0,0 +1,49 @@
+from django.db import migrations, models
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    """Point recipes at one row per (name, measurement_unit) pair."""
+    Ingredients = apps.get_model('api', 'Ingredients')
+    AddIngredientInRec = apps.get_model('api', 'AddIngredientInRec')
+    duplicates = Ingredients.objects.values(
+        'name', 'measurement_unit'
+    ).annotate(
+        keep=models.Min('id'), total=models.Count('id')
+    ).filter(total__gt=1)
+    for group in duplicates:
+        others = Ingredients.objects.filter(
+            name=group['name'], measurement_unit=group['measurement_unit']
+        ).exclude(id=group['keep'])
+        recipes = set(AddIngredientInRec.objects.filter(
+            ingredient_id=group['keep']
+        ).values_list('recipe_id', flat=True))
+        for amount in AddIngredientInRec.objects.filter(
+            ingredient__in=others
+        ).order_by('id'):
+            if amount.recipe_id in recipes:
+                amount.delete()
+            else:
+                amount.ingredient_id = group['keep']
+                amount.save(update_fields=['ingredient'])
+                recipes.add(amount.recipe_id)
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_ingredients_name_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredients',
+            constraint=models.UniqueConstraint(
+                fields=('name', 'measurement_unit'),
+                name='ingredient_name_unit_unique'
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+def count_recipe_relations(apps, schema_editor):
+    Recipe = apps.get_model('api', 'Recipe')
+    for recipe in Recipe.objects.annotate(
+        favorites=models.Count('is_favorited', distinct=True),
+        in_carts=models.Count('is_in_shopping_cart', distinct=True),
+    ).filter(models.Q(favorites__gt=0) | models.Q(in_carts__gt=0)):
+        Recipe.objects.filter(pk=recipe.pk).update(
+            favorites_count=recipe.favorites,
+            in_carts_count=recipe.in_carts,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_ingredients_name_unit_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(
+            count_recipe_relations, migrations.RunPython.noop
+        ),
+    ]
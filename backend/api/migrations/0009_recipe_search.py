@@ -0,0 +1,49 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:07
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FILL_VECTORS = (
+    "UPDATE api_recipe r SET search_vector = "
+    "setweight(to_tsvector('russian', coalesce(r.name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(("
+    "SELECT string_agg(i.name, ' ') FROM api_addingredientinrec a "
+    "JOIN api_ingredients i ON i.id = a.ingredient_id "
+    "WHERE a.recipe_id = r.id), '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(r.text, '')), 'C')"
+)
+CREATE_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS api_recipe_search_vector_idx '
+    'ON api_recipe USING gin (search_vector)',
+    FILL_VECTORS,
+)
+DROP_INDEXES = (
+    'DROP INDEX IF EXISTS api_recipe_search_vector_idx',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_postgresql(CREATE_INDEXES), run_postgresql(DROP_INDEXES)
+        ),
+    ]
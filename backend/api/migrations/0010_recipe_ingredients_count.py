@@ -0,0 +1,35 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+def count_recipe_ingredients(apps, schema_editor):
+    Recipe = apps.get_model('api', 'Recipe')
+    for recipe in Recipe.objects.annotate(
+        total=models.Count('amounts')
+    ).filter(total__gt=0):
+        Recipe.objects.filter(pk=recipe.pk).update(
+            ingredients_count=recipe.total
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_recipe_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Число ингредиентов'),
+        ),
+        migrations.AddIndex(
+            model_name='addingredientinrec',
+            index=models.Index(fields=['ingredient', 'recipe'], name='amount_ingredient_recipe_idx'),
+        ),
+        migrations.RunPython(
+            count_recipe_ingredients, migrations.RunPython.noop
+        ),
+    ]
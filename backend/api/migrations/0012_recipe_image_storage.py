@@ -0,0 +1,19 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:11
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=api.storage.ContentAddressedStorage(), upload_to='image/', verbose_name='Картинка'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.3 on 2026-10-18 21:02
+
+import datetime
+
+from django.db import migrations
+from django.db.migrations.recorder import MigrationRecorder
+
+# Favorites and cart entries older than 0007 have no known date and were
+# given the time of that migration. They are dated far in the past, so
+# they decay to nothing instead of all counting as one burst of events.
+HISTORY_CREATED = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def backdate_history(apps, schema_editor):
+    applied = MigrationRecorder(schema_editor.connection).migration_qs.filter(
+        app='api', name='0007_recipe_ranking'
+    ).values_list('applied', flat=True).first()
+    if applied is None:
+        return
+    for model_name in ('FavoriteRecipe', 'ShoppingList'):
+        apps.get_model('api', model_name).objects.filter(
+            created__lte=applied
+        ).update(created=HISTORY_CREATED)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_recipe_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(backdate_history, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from colorfield.fields import ColorField
 
+from .sparse import FULL
+from .storage import content_addressed_storage
+
 User = get_user_model()
 
 
@@ -68,11 +72,69 @@ class Ingredients(models.Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
         ordering = ('name',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='ingredient_name_unit_unique'
+            )
+        ]
 
     def __str__(self):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_related(self, user, fieldset=FULL):
+        """Prefetch what the recipe read serializer touches.
+
+        Only the relations ``fieldset`` includes are fetched, and the
+        collapsed ones are fetched as bare ids.
+        """
+        deferred = ['search_vector']
+        deferred.extend(
+            field for field in ('text', 'image_variants')
+            if not fieldset.includes(field)
+        )
+        lookups = []
+        if fieldset.expands('author'):
+            lookups.append(models.Prefetch(
+                'author', queryset=User.objects.with_subscribed(user)
+            ))
+        if fieldset.includes('ingredients'):
+            amounts = AddIngredientInRec.objects.select_related('ingredient')
+            if not fieldset.expands('ingredients'):
+                amounts = AddIngredientInRec.objects.only(
+                    'recipe_id', 'ingredient_id'
+                )
+            lookups.append(models.Prefetch('amounts', queryset=amounts))
+        if fieldset.includes('tags'):
+            tags = Tag.objects.all()
+            if not fieldset.expands('tags'):
+                tags = tags.only('id')
+            lookups.append(models.Prefetch('tags', queryset=tags))
+        return self.defer(*deferred).prefetch_related(*lookups)
+
+    def with_user_flags(self, user, fieldset=FULL):
+        """Annotate ``favorited`` and ``in_shopping_cart`` for ``user``."""
+        if not user.is_authenticated:
+            return self
+        flags = {}
+        if fieldset.includes('is_favorited'):
+            flags['favorited'] = models.Exists(
+                FavoriteRecipe.objects.filter(
+                    user=user, recipe=models.OuterRef('pk')
+                )
+            )
+        if fieldset.includes('is_in_shopping_cart'):
+            flags['in_shopping_cart'] = models.Exists(
+                ShoppingList.objects.filter(
+                    user=user, recipe=models.OuterRef('pk')
+                )
+            )
+        return self.annotate(**flags)
+
+
 class Recipe(models.Model):
     name = models.CharField(
         max_length=200,
@@ -87,8 +149,14 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='image/',
+        storage=content_addressed_storage,
         verbose_name='Картинка',
     )
+    image_variants = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name='Уменьшенные копии',
+    )
     text = models.TextField(
         verbose_name='Рецепт',
     )
@@ -113,6 +181,28 @@ class Recipe(models.Model):
                               message='Too much time for cooking'),
         ]
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном',
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В списках покупок',
+    )
+    ingredients_count = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число ингредиентов',
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор',
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
@@ -152,6 +242,12 @@ class AddIngredientInRec(models.Model):
                 name='recipe_ingredient_unique'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['ingredient', 'recipe'],
+                name='amount_ingredient_recipe_idx'
+            )
+        ]
 
     def __str__(self):
         return f'{self.ingredient} {self.recipe}'
@@ -170,6 +266,11 @@ class ShoppingList(models.Model):
         related_name='is_in_shopping_cart',
         verbose_name='Рецепт для покупки',
     )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Добавлено',
+    )
 
     class Meta:
         verbose_name = 'Покупка'
@@ -198,6 +299,11 @@ class FavoriteRecipe(models.Model):
         related_name='is_favorited',
         verbose_name='Рецепт',
     )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Добавлено',
+    )
 
     class Meta:
         verbose_name = 'Избранное'
@@ -208,3 +314,67 @@ class FavoriteRecipe(models.Model):
                 name='user_recept_unique'
             )
         ]
+
+
+class RecipeRanking(models.Model):
+    """Time-decayed popularity score, refreshed by ``rank_recipes``."""
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        verbose_name='Рецепт',
+    )
+    score = models.FloatField(
+        default=0,
+        db_index=True,
+        verbose_name='Популярность',
+    )
+    refreshed_at = models.DateTimeField(
+        verbose_name='Пересчитано',
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг рецепта'
+        verbose_name_plural = 'Рейтинг рецептов'
+
+    def __str__(self):
+        return f'{self.recipe} {self.score:.2f}'
+
+
+class FeedItem(models.Model):
+    """Recipe delivered to a follower's feed when it was published."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        verbose_name='Подписчик',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        verbose_name='Рецепт',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор',
+    )
+
+    class Meta:
+        verbose_name = 'Лента'
+        verbose_name_plural = 'Ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='feed_user_recipe_unique'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'author'],
+                name='feed_user_author_idx'
+            )
+        ]
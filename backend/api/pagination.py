@@ -1,5 +1,113 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.core.exceptions import EmptyResultSet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .cache import get_page_count_version
+import api.constants as c
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that keeps the total count of a query for a short time.
+
+    Counts are cached under a version the signals bump on every write to
+    a paginated list. A page past the end of a cached count is checked
+    against a fresh count before it is rejected, which covers writes the
+    signals do not see.
+    """
+    count_is_cached = False
+
+    @cached_property
+    def count_cache_key(self):
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except (AttributeError, EmptyResultSet):
+            return None
+        return 'page_count:' + hashlib.md5(
+            f'{sql}{params}'.encode()
+        ).hexdigest()
+
+    @cached_property
+    def count_cache_version(self):
+        return get_page_count_version()
+
+    def count_objects(self):
+        count = Paginator.count.func(self)
+        if self.count_cache_key is not None:
+            cache.set(
+                self.count_cache_key, count, c.PAGE_COUNT_CACHE_TIMEOUT,
+                version=self.count_cache_version,
+            )
+        return count
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is not None:
+            count = cache.get(
+                self.count_cache_key, version=self.count_cache_version
+            )
+            if count is not None:
+                self.count_is_cached = True
+                return count
+        return self.count_objects()
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_cached:
+                raise
+        self.count_is_cached = False
+        self.count = self.count_objects()
+        del self.num_pages
+        return super().validate_number(number)
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination over the queryset's own id ordering."""
+    page_size_query_param = 'limit'
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = queryset.query.order_by
+        if not ordering:
+            return (self.ordering,)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValidationError({
+                self.cursor_query_param: (
+                    'Cursor pagination is not available for this ordering.'
+                )
+            })
+        return tuple(ordering)
 
 
 class CustomPageSizePagination(PageNumberPagination):
+    """Page number pagination with an opt-in cursor mode.
+
+    Passing ``?cursor=`` (empty for the first page) switches to keyset
+    pagination, which needs neither COUNT(*) nor OFFSET. The response
+    then has ``next``/``previous`` links but no ``count``.
+    """
     page_size_query_param = 'limit'
+    django_paginator_class = CachedCountPaginator
+    cursor_paginator_class = IdCursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_paginator_class.cursor_query_param in (
+            request.query_params
+        ):
+            self.cursor_paginator = self.cursor_paginator_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
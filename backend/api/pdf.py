@@ -0,0 +1,61 @@
+import logging
+from io import BytesIO
+
+from django.utils import timezone
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
+
+import api.constants as c
+
+from .services import format_shopping_list_item
+
+logger = logging.getLogger(__name__)
+
+
+def register_fonts():
+    """Parse and register the TTF font; called once from ApiConfig.ready."""
+    try:
+        pdfmetrics.registerFont(TTFont(c.FONT_NAME, c.FONT_FILE))
+    except TTFError:
+        logger.warning(
+            'Font %s not found, falling back to %s',
+            c.FONT_FILE, c.FALLBACK_FONT_NAME
+        )
+
+
+def get_font_name():
+    if c.FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return c.FONT_NAME
+    return c.FALLBACK_FONT_NAME
+
+
+def render_shopping_list(shopping_list):
+    """Draw the aggregated shopping list and return the PDF bytes.
+
+    Lines that do not fit on a page are continued on the next one.
+    """
+    font_name = get_font_name()
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.setTitle(c.DOC_TITLE)
+    pdf.setFont(font_name, c.FONT_SIZE_TITLE)
+    pdf.drawCentredString(c.X_FOR_TITLE, c.Y_FOR_TITLE, c.TITLE)
+    pdf.setFont(font_name, c.FONT_SIZE_SUB_TITLE)
+    pdf.drawCentredString(
+        c.X_FOR_SUB_TITLE, c.Y_FOR_SUB_TITLE, f'{timezone.now().date()}'
+    )
+    pdf.line(c.X1, c.Y1, c.X2, c.Y2)
+    height = c.Y_FOR_INGREDIENTS
+    for item in shopping_list:
+        if height < c.Y_PAGE_BOTTOM:
+            pdf.showPage()
+            pdf.setFont(font_name, c.FONT_SIZE_SUB_TITLE)
+            height = c.Y_PAGE_TOP
+        pdf.drawString(
+            c.X_FOR_INGREDIENTS, height, format_shopping_list_item(item)
+        )
+        height -= c.LINE_HEIGHT
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+import api.constants as c
+
+from .models import FavoriteRecipe, Recipe, RecipeRanking, ShoppingList
+
+EVENT_WEIGHTS = (
+    (FavoriteRecipe, c.RANKING_FAVORITE_WEIGHT),
+    (ShoppingList, c.RANKING_CART_WEIGHT),
+)
+
+
+def decay(seconds):
+    """Share of a score left after ``seconds`` have passed."""
+    return 0.5 ** (max(seconds, 0) / c.RANKING_HALF_LIFE)
+
+
+def settled(run_at):
+    """Latest event time a run at ``run_at`` counts."""
+    return run_at - timedelta(seconds=c.RANKING_SETTLE_TIME)
+
+
+def get_event_scores(now, since=None):
+    """Sum the decayed weights of settled events per recipe.
+
+    Only events up to ``settled(now)`` are read, and with ``since`` only
+    those after ``settled(since)``. Consecutive runs thus read adjacent
+    windows, and an event committed within RANKING_SETTLE_TIME of its
+    creation is counted exactly once.
+    """
+    scores = defaultdict(float)
+    for model, weight in EVENT_WEIGHTS:
+        events = model.objects.filter(created__lte=settled(now))
+        if since is not None:
+            events = events.filter(created__gt=settled(since))
+        for recipe_id, created in events.values_list(
+            'recipe_id', 'created'
+        ).iterator():
+            scores[recipe_id] += weight * decay(
+                (now - created).total_seconds()
+            )
+    return scores
+
+
+@transaction.atomic
+def rebuild_ranking(now=None):
+    """Recompute every score from the full event history."""
+    now = now or timezone.now()
+    scores = get_event_scores(now)
+    RecipeRanking.objects.all().delete()
+    RecipeRanking.objects.bulk_create(
+        (
+            RecipeRanking(recipe_id=recipe_id, score=score, refreshed_at=now)
+            for recipe_id, score in scores.items()
+        ),
+        batch_size=c.RANKING_BATCH_SIZE,
+    )
+    return len(scores)
+
+
+@transaction.atomic
+def refresh_ranking(now=None):
+    """Bring the scores up to date with events since the last run.
+
+    Stored scores are decayed to ``now`` in one UPDATE and only the
+    events settled since the last run are read. Removed favorites and
+    cart entries are picked up by the next full rebuild.
+    """
+    last_run = RecipeRanking.objects.aggregate(
+        last_run=Max('refreshed_at')
+    )['last_run']
+    if last_run is None:
+        return rebuild_ranking(now)
+    now = now or timezone.now()
+    RecipeRanking.objects.update(
+        score=F('score') * decay((now - last_run).total_seconds()),
+        refreshed_at=now,
+    )
+    scores = get_event_scores(now, since=last_run)
+    rankings = RecipeRanking.objects.filter(recipe_id__in=scores)
+    for ranking in rankings:
+        ranking.score += scores.pop(ranking.recipe_id)
+    RecipeRanking.objects.bulk_update(
+        rankings, ['score'], batch_size=c.RANKING_BATCH_SIZE
+    )
+    existing = Recipe.objects.filter(pk__in=scores).values_list(
+        'pk', flat=True
+    )
+    RecipeRanking.objects.bulk_create(
+        (
+            RecipeRanking(
+                recipe_id=recipe_id,
+                score=scores[recipe_id],
+                refreshed_at=now,
+            )
+            for recipe_id in existing
+        ),
+        batch_size=c.RANKING_BATCH_SIZE,
+    )
+    return len(rankings) + len(existing)
@@ -0,0 +1,140 @@
+import csv
+from io import StringIO
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .pdf import render_shopping_list
+from .services import format_shopping_list_item
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    ORJSON_OPTIONS = None
+else:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    The output is the same bytes DRF's compact UTF-8 rendering gives.
+    Types orjson leaves alone, such as datetimes, go through the DRF
+    encoder. Indented or ASCII-only output, and anything orjson cannot
+    encode, is rendered by the stdlib renderer instead. The only
+    difference left is the spelling of very small or very large floats,
+    e.g. 1e16 instead of 1e+16.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Escaped like DRF does, to stay a strict subset of JavaScript.
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """Base class for the downloadable shopping list formats.
+
+    ``data`` is the aggregated list from ``get_shopping_list``. Error
+    responses raised before the view runs are rendered as JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            response['Content-Type'] = FastJSONRenderer.media_type
+            return FastJSONRenderer().render(data)
+        return self.render_shopping_list(data)
+
+    def render_shopping_list(self, shopping_list):
+        raise NotImplementedError(
+            '.render_shopping_list() must be overridden.'
+        )
+
+
+class ShoppingListPDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    render_style = 'binary'
+
+    def render_shopping_list(self, shopping_list):
+        return render_shopping_list(shopping_list)
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def render_shopping_list(self, shopping_list):
+        return '\n'.join(
+            format_shopping_list_item(item) for item in shopping_list
+        ).encode(self.charset)
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_shopping_list(self, shopping_list):
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(('name', 'amount', 'measurement_unit'))
+        for item in shopping_list:
+            writer.writerow((
+                item['ingredient__name'],
+                item['total_amount'],
+                item['ingredient__measurement_unit'],
+            ))
+        return output.getvalue().encode(self.charset)
+
+
+class ShoppingListJSONRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render_shopping_list(self, shopping_list):
+        return FastJSONRenderer().render([
+            {
+                'name': item['ingredient__name'],
+                'amount': item['total_amount'],
+                'measurement_unit': item['ingredient__measurement_unit'],
+            }
+            for item in shopping_list
+        ])
+
+
+# The first renderer is the default when the client does not ask for
+# a specific format, which keeps PDF as the download format.
+SHOPPING_LIST_RENDERERS = (
+    ShoppingListPDFRenderer,
+    ShoppingListTextRenderer,
+    ShoppingListCSVRenderer,
+    ShoppingListJSONRenderer,
+)
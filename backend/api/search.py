@@ -0,0 +1,133 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection
+from django.db.models import (Case, F, FloatField, OuterRef, Subquery,
+                              Value, When)
+
+import api.constants as c
+
+from .models import AddIngredientInRec, Recipe
+
+# Field weights, highest first, as used by both search backends.
+WEIGHTS = (('name', 'A', 1.0), ('ingredients', 'B', 0.4), ('text', 'C', 0.2))
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class RecipeSearchIndex:
+    """In-process inverted index used on databases other than PostgreSQL.
+
+    Maps every word to the recipes containing it and the weight of the
+    best field it appears in. Built on first use and dropped whenever a
+    recipe's searchable content changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+
+    def invalidate(self):
+        self._postings = None
+
+    def _load(self):
+        with self._lock:
+            if self._postings is None:
+                documents = defaultdict(dict)
+                for pk, name, text in Recipe.objects.values_list(
+                    'pk', 'name', 'text'
+                ):
+                    documents[pk].update(name=name, text=text)
+                for pk, name in AddIngredientInRec.objects.values_list(
+                    'recipe_id', 'ingredient__name'
+                ):
+                    documents[pk]['ingredients'] = ' '.join(
+                        (documents[pk].get('ingredients', ''), name)
+                    )
+                postings = defaultdict(dict)
+                for pk, document in documents.items():
+                    for field, _, weight in reversed(WEIGHTS):
+                        for token in tokenize(document.get(field, '')):
+                            postings[token][pk] = weight
+                self._postings = postings
+            return self._postings
+
+    def search(self, query):
+        """Return ``{id: score}`` of recipes containing every word."""
+        tokens = tokenize(query)
+        if not tokens:
+            return {}
+        postings = self._load()
+        scores = None
+        for token in tokens:
+            matches = postings.get(token, {})
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {
+                    pk: score + matches[pk]
+                    for pk, score in scores.items() if pk in matches
+                }
+        return scores
+
+
+recipe_index = RecipeSearchIndex()
+
+
+def update_search_vectors(recipe_ids):
+    """Recompute the stored search vectors of the given recipes."""
+    if connection.vendor != 'postgresql':
+        recipe_index.invalidate()
+        return
+    ingredient_names = AddIngredientInRec.objects.filter(
+        recipe=OuterRef('pk')
+    ).values('recipe').annotate(
+        names=StringAgg('ingredient__name', ' ')
+    ).values('names')
+    fields = {
+        'name': F('name'),
+        'ingredients': Subquery(ingredient_names),
+        'text': F('text'),
+    }
+    vector = None
+    for field, weight, _ in WEIGHTS:
+        part = SearchVector(
+            fields[field], weight=weight, config=c.SEARCH_CONFIG
+        )
+        vector = part if vector is None else vector + part
+    Recipe.objects.filter(pk__in=recipe_ids).update(search_vector=vector)
+
+
+def search_recipes(queryset, query):
+    """Recipes matching every word of ``query``, most relevant first."""
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(query, config=c.SEARCH_CONFIG)
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(
+                F('search_vector'), search_query, output_field=FloatField()
+            )
+        ).order_by('-rank', '-id')
+    scores = recipe_index.search(query)
+    ids = sorted(scores, key=lambda pk: (-scores[pk], -pk))[
+        :c.SEARCH_FALLBACK_LIMIT
+    ]
+    if not ids:
+        return queryset.none()
+    # Few distinct scores exist, so the rank is one CASE branch per
+    # score rather than per recipe. It is an annotation, so cursor
+    # pagination can order by it like the PostgreSQL rank.
+    ranks = defaultdict(list)
+    for pk in ids:
+        ranks[scores[pk]].append(pk)
+    return queryset.filter(pk__in=ids).annotate(rank=Case(
+        *(When(pk__in=pks, then=Value(score))
+          for score, pks in ranks.items()),
+        output_field=FloatField(),
+    )).order_by('-rank', '-id')
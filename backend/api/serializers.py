@@ -1,12 +1,17 @@
+from functools import partial
+
 from django.db import transaction
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
 
 from users.serializers import UserSerializer
 
-from .fields import Base64ImageField
-from .models import (Ingredients, Recipe, Tag, User,
-                     AddIngredientInRec, FavoriteRecipe)
+from .cache import invalidate_recipe_shopping_lists
+from .fields import Base64ImageField, ImageVariantsField
+from .images import schedule_variants
+from .models import AddIngredientInRec, Ingredients, Recipe, Tag
+from .search import update_search_vectors
+from .sparse import SparseFieldsMixin
+import api.constants as c
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -34,10 +39,11 @@ class IngredientWriteSerializer(serializers.ModelSerializer):
 
 
 class FavoriteRecipeSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
 class RecipeIngredientReadSerializer(serializers.ModelSerializer):
@@ -53,34 +59,82 @@ class RecipeIngredientReadSerializer(serializers.ModelSerializer):
         read_only_fields = ('amount',)
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class RecipeReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     ingredients = RecipeIngredientReadSerializer(source='amounts', many=True)
     tags = TagSerializer(many=True, read_only=True)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
+
+    collapsed_fields = {
+        'author': partial(serializers.PrimaryKeyRelatedField, read_only=True),
+        'ingredients': partial(
+            serializers.SlugRelatedField,
+            source='amounts', slug_field='ingredient_id',
+            many=True, read_only=True,
+        ),
+        'tags': partial(
+            serializers.PrimaryKeyRelatedField, many=True, read_only=True
+        ),
+    }
 
     class Meta:
         model = Recipe
         fields = (
-            'id', 'author', 'name', 'text', 'image',
+            'id', 'author', 'name', 'text', 'image', 'image_variants',
             'ingredients', 'tags', 'cooking_time',
-            'is_favorited', 'is_in_shopping_cart',
+            'is_favorited', 'is_in_shopping_cart', 'favorites_count',
         )
 
     def get_is_favorited(self, obj):
         user = self.context['request'].user
         if not user.is_authenticated:
             return False
+        if hasattr(obj, 'favorited'):
+            return obj.favorited
         return obj.is_favorited.filter(user=user).exists()
 
     def get_is_in_shopping_cart(self, obj):
         user = self.context['request'].user
         if not user.is_authenticated:
             return False
+        if hasattr(obj, 'in_shopping_cart'):
+            return obj.in_shopping_cart
         return obj.is_in_shopping_cart.filter(user=user).exists()
 
 
+class CookableRecipeSerializer(RecipeReadSerializer):
+    matched = serializers.IntegerField(read_only=True)
+    missing = serializers.IntegerField(read_only=True)
+    coverage = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeReadSerializer.Meta):
+        fields = RecipeReadSerializer.Meta.fields + (
+            'matched', 'missing', 'coverage',
+        )
+
+
+class CookableQuerySerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    min_coverage = serializers.FloatField(
+        min_value=0, max_value=1, default=0
+    )
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=c.BATCH_MAX_SIZE,
+    )
+
+    def validate_recipes(self, recipes):
+        return list(dict.fromkeys(recipes))
+
+
 class RecipeWriteSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     image = Base64ImageField(max_length=None, use_url=True)
@@ -96,38 +150,37 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             'ingredients', 'tags', 'cooking_time',
         )
 
+    def validate_ingredients(self, ingredients):
+        ids = [ingredient['id'] for ingredient in ingredients]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Ingredient must be unique')
+        if any(ingredient['amount'] < 0 for ingredient in ingredients):
+            raise serializers.ValidationError('Amount must be more then null')
+        missing = set(ids) - set(Ingredients.objects.in_bulk(ids))
+        if missing:
+            raise serializers.ValidationError(
+                f'Ingredients do not exist: {sorted(missing)}'
+            )
+        return ingredients
+
     @transaction.atomic(durable=True)
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
-        ingredients_set = set()
-        for ingredient in ingredients_data:
-            if ingredient['id'] in ingredients_set:
-                raise serializers.ValidationError(
-                    'Ingredient must be unique'
-                )
-            if ingredient['amount'] < 0:
-                raise serializers.ValidationError(
-                    'Amount must be more then null'
-                )
-            ingredients_set.add(ingredient['id'])
-        recipe = Recipe.objects.create(**validated_data)
-        # recipes_ingredients = []
-        # for ingredient in ingredients_data:
-        #     recipes_ingredients.append(
-        #         ingredient=Ingredients.objects.get(id=ingredient['id']),
-        #         recipe=recipe, amount=ingredient['amount']
-        #     )
-        # AddIngredientInRec.objects.bulk_create(recipes_ingredients)
-        for ingredient in ingredients_data:
-            amount = ingredient['amount']
-            id = ingredient['id']
-            AddIngredientInRec.objects.create(
-                ingredient=get_object_or_404(Ingredients, id=id),
-                recipe=recipe, amount=amount
+        recipe = Recipe.objects.create(
+            ingredients_count=len(ingredients_data), **validated_data
+        )
+        AddIngredientInRec.objects.bulk_create(
+            AddIngredientInRec(
+                recipe=recipe,
+                ingredient_id=ingredient['id'],
+                amount=ingredient['amount'],
             )
-        for tag in tags_data:
-            recipe.tags.add(tag)
+            for ingredient in ingredients_data
+        )
+        recipe.tags.set(tags_data)
+        update_search_vectors([recipe.pk])
+        schedule_variants(recipe)
         return recipe
 
     @transaction.atomic(durable=True)
@@ -136,95 +189,62 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         tags_data = validated_data.pop('tags')
         instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
+        image_name = instance.image.name
         instance.image = validated_data.get('image', instance.image)
         instance.cooking_time = validated_data.get(
             'cooking_time', instance.cooking_time
         )
-        ingredients_set = set()
-        for ingredient in ingredients_data:
-            if ingredient['id'] in ingredients_set:
-                raise serializers.ValidationError(
-                    'Ingredient must be unique'
-                )
-            if ingredient['amount'] < 0:
-                raise serializers.ValidationError(
-                    'Amount must be more then null'
-                )
-            ingredients_set.add(ingredient['id'])
-        AddIngredientInRec.objects.filter(recipe=instance).delete()
-        for ingredient in ingredients_data:
-            amount = ingredient['amount']
-            id = ingredient['id']
-            AddIngredientInRec.objects.create(
-                ingredient=get_object_or_404(Ingredients, id=id),
-                recipe=instance, amount=amount
-            )
-        for tag in tags_data:
-            instance.tags.add(tag)
+        instance.ingredients_count = len(ingredients_data)
+        self.update_amounts(instance, ingredients_data)
+        instance.tags.set(tags_data)
         instance.save()
+        if instance.image.name != image_name:
+            instance.image_variants = {}
+            instance.save(update_fields=['image_variants'])
+            schedule_variants(instance)
+        invalidate_recipe_shopping_lists([instance.pk])
+        update_search_vectors([instance.pk])
         return instance
 
+    def update_amounts(self, recipe, ingredients_data):
+        """Bring the recipe's amounts in line with ``ingredients_data``.
+
+        Only the difference is written: removed ingredients are deleted,
+        changed amounts are updated and new ones are inserted, each in a
+        single query.
+        """
+        existing = {
+            amount.ingredient_id: amount for amount in recipe.amounts.all()
+        }
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients_data
+        }
+        removed = existing.keys() - amounts.keys()
+        if removed:
+            recipe.amounts.filter(ingredient_id__in=removed).delete()
+        changed = []
+        created = []
+        for ingredient_id, amount in amounts.items():
+            if ingredient_id not in existing:
+                created.append(AddIngredientInRec(
+                    recipe=recipe, ingredient_id=ingredient_id, amount=amount
+                ))
+            elif existing[ingredient_id].amount != amount:
+                existing[ingredient_id].amount = amount
+                changed.append(existing[ingredient_id])
+        if changed:
+            AddIngredientInRec.objects.bulk_update(changed, ['amount'])
+        if created:
+            AddIngredientInRec.objects.bulk_create(created)
+
     def to_representation(self, instance):
+        request = self.context.get('request')
+        instance = Recipe.objects.with_related(
+            request.user
+        ).with_user_flags(request.user).get(pk=instance.pk)
         data = RecipeReadSerializer(
             instance,
-            context={'request': self.context.get('request')}
+            context={'request': request}
         ).data
         return data
-
-
-class FavoriteSerializer(serializers.ModelSerializer):
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
-    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
-
-    class Meta:
-        model = FavoriteRecipe
-        fields = (
-            'user',
-            'recipe'
-        )
-
-    def validate(self, obj):
-        user = self.context['request'].user
-        recipe = obj['recipe']
-        if (
-            self.context.get('request').method == 'POST'
-            and user.is_favorited.filter(recipe=recipe).exists()
-        ):
-            raise serializers.ValidationError(
-                'Already in favorite')
-        if (
-            self.context.get('request').method == 'DELETE'
-            and not user.is_favorited.filter(recipe=recipe).exists()
-        ):
-            raise serializers.ValidationError(
-                'You have not that in your favorite')
-        return obj
-
-
-class ShoppingCartSerializer(serializers.ModelSerializer):
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
-    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
-
-    class Meta:
-        model = FavoriteRecipe
-        fields = (
-            'user',
-            'recipe'
-        )
-
-    def validate(self, obj):
-        user = self.context['request'].user
-        recipe = obj['recipe']
-        if (
-            self.context.get('request').method == 'POST'
-            and user.is_in_shopping_cart.filter(recipe=recipe).exists()
-        ):
-            raise serializers.ValidationError(
-                'Already in shopping card')
-        if (
-            self.context.get('request').method == 'DELETE'
-            and not user.is_in_shopping_cart.filter(recipe=recipe).exists()
-        ):
-            raise serializers.ValidationError(
-                'That recipe is not in your shopping card')
-        return obj
@@ -0,0 +1,185 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast, Greatest
+
+from .models import AddIngredientInRec, Recipe
+
+ADDED = 'added'
+ALREADY_ADDED = 'already_added'
+REMOVED = 'removed'
+NOT_ADDED = 'not_added'
+NOT_FOUND = 'not_found'
+
+
+def get_shopping_list(user):
+    """Sum ingredient amounts over every recipe in the user's cart.
+
+    Ingredients sharing a name but measured in different units are kept
+    apart. The whole list is built by a single grouped query.
+    """
+    return (
+        AddIngredientInRec.objects
+        .filter(recipe__is_in_shopping_cart__user=user)
+        .values('ingredient__name', 'ingredient__measurement_unit')
+        .annotate(total_amount=Sum('amount'))
+        .order_by('ingredient__name', 'ingredient__measurement_unit')
+    )
+
+
+def get_cookable_recipes(queryset, ingredient_ids, min_coverage=0):
+    """Recipes ranked by the share of their ingredients the user has.
+
+    The join only reaches the amounts of the given ingredients through
+    the (ingredient, recipe) index, and the recipe's stored ingredient
+    count gives the total, so everything is one grouped query.
+    """
+    queryset = queryset.filter(
+        amounts__ingredient_id__in=ingredient_ids
+    ).annotate(
+        matched=Count('amounts'),
+        total=Greatest('ingredients_count', Count('amounts')),
+    ).annotate(
+        coverage=Cast('matched', FloatField()) / F('total'),
+        missing=F('total') - F('matched'),
+    )
+    if min_coverage:
+        queryset = queryset.filter(coverage__gte=min_coverage)
+    return queryset.order_by('-coverage', '-matched', '-id')
+
+
+def format_shopping_list_item(item):
+    return (
+        f"{item['ingredient__name']} - {item['total_amount']} "
+        f"{item['ingredient__measurement_unit']}"
+    )
+
+
+def update_counter(model, pk, field, delta):
+    """Adjust a denormalised counter in place with an F() expression.
+
+    Decrements never take the counter below zero; ``recount`` repairs
+    any drift.
+    """
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def update_counters(model, pks, field, delta):
+    """Apply the same counter change to many rows in one UPDATE."""
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def add_relation(model, counter, **fields):
+    """Insert a favorite, cart or follow row and bump its counter.
+
+    A duplicate is caught by the unique constraint rather than checked
+    beforehand, so concurrent double-taps cannot both get through.
+    ``counter`` is a ``(model, pk, field)`` triple for update_counter.
+    Returns False when the row already existed.
+    """
+    try:
+        with transaction.atomic():
+            model.objects.create(**fields)
+            update_counter(*counter, 1)
+    except IntegrityError:
+        return False
+    return True
+
+
+def remove_relation(model, counter, **fields):
+    """Delete the matching row; False when there was nothing to delete."""
+    with transaction.atomic():
+        deleted, _ = model.objects.filter(**fields).delete()
+        if deleted:
+            update_counter(*counter, -deleted)
+    return bool(deleted)
+
+
+def insert_relations(model, user, recipe_ids):
+    """Insert the user's rows for ``recipe_ids``; return the ids inserted.
+
+    One INSERT covers the usual case. When a concurrent request has
+    added one of the rows meanwhile, the rows are inserted one by one
+    instead, so that only the rows written here are reported and
+    counted.
+    """
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(
+                model(user=user, recipe_id=recipe_id)
+                for recipe_id in recipe_ids
+            )
+        return set(recipe_ids)
+    except IntegrityError:
+        pass
+    inserted = set()
+    for recipe_id in recipe_ids:
+        try:
+            with transaction.atomic():
+                model.objects.create(user=user, recipe_id=recipe_id)
+        except IntegrityError:
+            continue
+        inserted.add(recipe_id)
+    return inserted
+
+
+def add_recipe_relations(model, counter_field, user, recipe_ids):
+    """Add many recipes to the user's favorites or cart at once.
+
+    Existence and current membership are read with one query each and
+    the new rows are written with one INSERT. Returns the outcome for
+    every requested id.
+    """
+    found = set(Recipe.objects.filter(
+        pk__in=recipe_ids
+    ).values_list('pk', flat=True))
+    with transaction.atomic():
+        present = set(model.objects.filter(
+            user=user, recipe_id__in=found
+        ).values_list('recipe_id', flat=True))
+        added = insert_relations(model, user, found - present)
+        update_counters(Recipe, added, counter_field, 1)
+    return {
+        recipe_id: (
+            NOT_FOUND if recipe_id not in found
+            else ADDED if recipe_id in added
+            else ALREADY_ADDED
+        )
+        for recipe_id in recipe_ids
+    }
+
+
+def remove_recipe_relations(model, counter_field, user, recipe_ids=None):
+    """Remove many recipes, or all of them, from favorites or cart.
+
+    Returns the outcome for every requested id.
+    """
+    relations = model.objects.filter(user=user)
+    if recipe_ids is not None:
+        relations = relations.filter(recipe_id__in=recipe_ids)
+    with transaction.atomic():
+        # Locking the rows keeps a concurrent removal from being
+        # counted twice.
+        removed = set(relations.select_for_update().values_list(
+            'recipe_id', flat=True
+        ))
+        relations.filter(recipe_id__in=removed).delete()
+        update_counters(Recipe, removed, counter_field, -1)
+    if recipe_ids is None:
+        return dict.fromkeys(removed, REMOVED)
+    found = removed | set(Recipe.objects.filter(
+        pk__in=set(recipe_ids) - removed
+    ).values_list('pk', flat=True))
+    return {
+        recipe_id: (
+            NOT_FOUND if recipe_id not in found
+            else REMOVED if recipe_id in removed
+            else NOT_ADDED
+        )
+        for recipe_id in recipe_ids
+    }
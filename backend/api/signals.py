@@ -0,0 +1,80 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .autocomplete import ingredient_index
+from .cache import (bump_shopping_list_version, invalidate_catalog,
+                    invalidate_page_counts, invalidate_recipe_shopping_lists)
+from .models import (FavoriteRecipe, Follow, Ingredients, Recipe,
+                     ShoppingList, Tag, User)
+from .search import recipe_index, update_search_vectors
+from .services import update_counter
+import api.constants as c
+
+
+@receiver((post_save, post_delete), sender=ShoppingList)
+def shopping_list_changed(sender, instance, **kwargs):
+    bump_shopping_list_version(instance.user_id)
+
+
+@receiver(post_save, sender=Ingredients)
+def ingredient_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_recipe_shopping_lists(
+            instance.amounts.values('recipe_id')
+        )
+        update_search_vectors(instance.amounts.values('recipe_id'))
+
+
+@receiver(pre_delete, sender=Ingredients)
+def ingredient_deleting(sender, instance, **kwargs):
+    # The amounts are gone by post_delete, so their recipes are noted
+    # before the cascade.
+    instance.deleted_from_recipes = list(
+        instance.amounts.values_list('recipe_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Ingredients)
+def ingredient_deleted(sender, instance, **kwargs):
+    recipe_ids = getattr(instance, 'deleted_from_recipes', ())
+    if recipe_ids:
+        invalidate_recipe_shopping_lists(recipe_ids)
+        update_search_vectors(recipe_ids)
+
+
+@receiver((post_save, post_delete), sender=Ingredients)
+def ingredients_catalog_changed(sender, **kwargs):
+    ingredient_index.invalidate()
+    invalidate_catalog(c.INGREDIENTS_CACHE_KEY)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tags_catalog_changed(sender, **kwargs):
+    invalidate_catalog(c.TAGS_CACHE_KEY)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=FavoriteRecipe)
+@receiver((post_save, post_delete), sender=ShoppingList)
+@receiver((post_save, post_delete), sender=Follow)
+@receiver((post_save, post_delete), sender=User)
+def paginated_list_changed(sender, **kwargs):
+    invalidate_page_counts()
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, **kwargs):
+    recipe_index.invalidate()
+
+
+# Kept here rather than in the views so that the admin and cascades
+# update the counter as well.
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        update_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_removed(sender, instance, **kwargs):
+    update_counter(User, instance.author_id, 'recipes_count', -1)
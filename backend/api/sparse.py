@@ -0,0 +1,79 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class Fieldset:
+    """Fields a read request asked for with ``?fields=`` and ``?expand=``.
+
+    Without ``fields`` the full representation is returned. With it,
+    only the listed fields are, and related objects are reduced to ids
+    unless they are also listed in ``expand``. Expanding a field also
+    includes it.
+    """
+    __slots__ = ('fields', 'expand')
+
+    def __init__(self, fields=None, expand=()):
+        self.fields = fields
+        self.expand = frozenset(expand)
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None or request.method not in SAFE_METHODS:
+            return FULL
+        params = request.query_params
+        if FIELDS_PARAM not in params:
+            return FULL
+        expand = parse_names(params.get(EXPAND_PARAM, ''))
+        return cls(frozenset(parse_names(params[FIELDS_PARAM]) | expand),
+                   expand)
+
+    @property
+    def is_full(self):
+        return self.fields is None
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.fields is None or name in self.expand
+
+
+FULL = Fieldset()
+
+
+class SparseFieldsMixin:
+    """Serializer mixin applying the request's fieldset to its fields.
+
+    Fields named in ``collapsed_fields`` are swapped for the field
+    returned by the mapped factory when they are not expanded. Only the
+    top-level serializer is affected; nested ones stay complete.
+    """
+    collapsed_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if parent is not None and not (
+            isinstance(parent, ListSerializer) and parent.parent is None
+        ):
+            return fields
+        fieldset = Fieldset.from_request(self.context.get('request'))
+        if fieldset.is_full:
+            return fields
+        return {
+            name: (
+                self.collapsed_fields[name]()
+                if name in self.collapsed_fields
+                and not fieldset.expands(name)
+                else field
+            )
+            for name, field in fields.items()
+            if fieldset.includes(name)
+        }
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import posixpath
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that names every file after its SHA-256.
+
+    Uploading content that is already stored returns the existing name
+    without writing anything but a new modification time, so a file is
+    kept once however many records point at it. Files nothing refers to
+    are removed by the ``collect_media`` command.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        return super().save(
+            self.get_hashed_name(name, content), content, max_length
+        )
+
+    def get_hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), digest.hexdigest() + extension
+        )
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            # Touch the file so that collect_media treats it as a fresh
+            # upload until the record referring to it is saved.
+            try:
+                os.utime(self.path(name))
+            except FileNotFoundError:
+                # Collected in between, so it is written again below.
+                pass
+            else:
+                return name
+        # Write under a unique name first so that concurrent uploads of
+        # the same content can both finish with an atomic rename.
+        temporary = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+content_addressed_storage = ContentAddressedStorage()
@@ -0,0 +1,47 @@
+import pytest
+
+import api.services
+from api.models import FavoriteRecipe
+
+FAVORITE_BATCH_URL = '/api/recipes/favorite/'
+
+
+@pytest.mark.django_db
+def test_insert_relations_reports_only_new_rows(user, author, make_recipes):
+    first, second = make_recipes(author, 2)
+    FavoriteRecipe.objects.create(user=user, recipe=first)
+    inserted = api.services.insert_relations(
+        FavoriteRecipe, user, {first.id, second.id}
+    )
+    assert inserted == {second.id}
+    assert FavoriteRecipe.objects.filter(user=user).count() == 2
+
+
+@pytest.mark.django_db
+def test_row_added_concurrently_is_not_counted_twice(
+    monkeypatch, user, user_client, author, make_recipes,
+):
+    raced, other = make_recipes(author, 2)
+    insert_relations = api.services.insert_relations
+
+    def insert_after_concurrent_request(model, user, recipe_ids):
+        api.services.add_relation(
+            model, (type(raced), raced.pk, 'favorites_count'),
+            user=user, recipe=raced,
+        )
+        return insert_relations(model, user, recipe_ids)
+
+    monkeypatch.setattr(
+        api.services, 'insert_relations', insert_after_concurrent_request
+    )
+    response = user_client.post(
+        FAVORITE_BATCH_URL, {'recipes': [raced.id, other.id]}, format='json'
+    )
+    assert response.status_code == 200, response.content
+    assert response.json()['results'] == [
+        {'id': raced.id, 'status': api.services.ALREADY_ADDED},
+        {'id': other.id, 'status': api.services.ADDED},
+    ]
+    raced.refresh_from_db()
+    other.refresh_from_db()
+    assert (raced.favorites_count, other.favorites_count) == (1, 1)
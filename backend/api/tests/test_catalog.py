@@ -0,0 +1,34 @@
+import pytest
+
+from api.cache import get_catalog, invalidate_catalog
+from api.models import Tag
+
+TAGS_URL = '/api/tags/'
+
+
+def test_build_racing_an_invalidation_is_not_served():
+    builds = []
+
+    def build():
+        builds.append(len(builds))
+        if len(builds) == 1:
+            invalidate_catalog('catalog:test')
+        return str(len(builds)).encode()
+
+    assert get_catalog('catalog:test', build)[0] == b'1'
+    assert get_catalog('catalog:test', build)[0] == b'2'
+    assert get_catalog('catalog:test', build)[0] == b'2'
+
+
+@pytest.mark.django_db
+def test_tag_changes_refresh_the_cached_list(anon_client, tags):
+    first = anon_client.get(TAGS_URL)
+    assert anon_client.get(
+        TAGS_URL, HTTP_IF_NONE_MATCH=first['ETag']
+    ).status_code == 304
+    Tag.objects.create(name='new tag', slug='new-tag')
+    second = anon_client.get(TAGS_URL, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert second.status_code == 200
+    assert 'new-tag' in {tag['slug'] for tag in second.json()}
+    tags[0].delete()
+    assert len(anon_client.get(TAGS_URL).json()) == len(tags)
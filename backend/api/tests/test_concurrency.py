@@ -0,0 +1,65 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+
+from api.models import FavoriteRecipe, Follow, ShoppingList
+
+USERS = 4
+THREADS_PER_USER = 2
+ROUNDS = 15
+
+
+def hammer(client, urls, seed):
+    """Send a random mix of POST and DELETE requests to ``urls``."""
+    choices = random.Random(seed)
+    statuses = []
+    try:
+        for _ in range(ROUNDS):
+            url = choices.choice(urls)
+            method = choices.choice((client.post, client.delete))
+            statuses.append(method(url).status_code)
+    finally:
+        connection.close()
+    return statuses
+
+
+# SQLite serialises writers by failing them with "database is locked",
+# so the race is only meaningful on PostgreSQL, which CI runs.
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='needs row-level locking'
+)
+@pytest.mark.django_db(transaction=True)
+def test_parallel_toggles_keep_counters_consistent(
+    django_user_model, author, make_recipes, make_client,
+):
+    recipe, = make_recipes(author, 1)
+    users = [
+        django_user_model.objects.create_user(
+            username=f'user{number}', email=f'user{number}@foodgram.ru',
+            password='Passw0rd!x',
+        )
+        for number in range(USERS)
+    ]
+    urls = [
+        f'/api/recipes/{recipe.id}/favorite/',
+        f'/api/recipes/{recipe.id}/shopping_cart/',
+        f'/api/users/{author.id}/subscribe/',
+    ]
+    clients = [
+        make_client(user)
+        for user in users for _ in range(THREADS_PER_USER)
+    ]
+    with ThreadPoolExecutor(len(clients)) as executor:
+        results = executor.map(
+            hammer, clients, [urls] * len(clients), range(len(clients))
+        )
+        statuses = [status for result in results for status in result]
+
+    assert set(statuses) <= {201, 204, 400}
+    recipe.refresh_from_db()
+    author.refresh_from_db()
+    assert recipe.favorites_count == FavoriteRecipe.objects.count()
+    assert recipe.in_carts_count == ShoppingList.objects.count()
+    assert author.followers_count == Follow.objects.count()
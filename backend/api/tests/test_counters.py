@@ -0,0 +1,115 @@
+from base64 import b64decode
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from api.models import FavoriteRecipe, Follow, Recipe, ShoppingList
+
+ADMIN_RECIPES_URL = '/admin/api/recipe/'
+
+
+@pytest.fixture
+def admin_client(django_user_model, client):
+    client.force_login(django_user_model.objects.create_superuser(
+        username='admin', email='admin@foodgram.ru', password='Passw0rd!x'
+    ))
+    return client
+
+
+def admin_recipe_data(author, tag, ingredient, image_data):
+    return {
+        'name': 'admin recipe',
+        'author': author.pk,
+        'text': 'text',
+        'cooking_time': 10,
+        'tags': [tag.pk],
+        'image': SimpleUploadedFile(
+            'recipe.png', b64decode(image_data.split(',')[1]), 'image/png'
+        ),
+        'amounts-TOTAL_FORMS': 1,
+        'amounts-INITIAL_FORMS': 0,
+        'amounts-0-ingredient': ingredient.pk,
+        'amounts-0-amount': 5,
+    }
+
+
+@pytest.mark.django_db
+def test_admin_create_and_delete_update_recipes_count(
+    media_root, admin_client, author, tags, ingredients, image_data,
+):
+    response = admin_client.post(f'{ADMIN_RECIPES_URL}add/', admin_recipe_data(
+        author, tags[0], ingredients[0], image_data,
+    ))
+    assert response.status_code == 302, response.context['errors']
+    recipe = Recipe.objects.get(name='admin recipe')
+    author.refresh_from_db()
+    assert author.recipes_count == 1
+
+    response = admin_client.post(
+        f'{ADMIN_RECIPES_URL}{recipe.pk}/delete/', {'post': 'yes'}
+    )
+    assert response.status_code == 302
+    author.refresh_from_db()
+    assert author.recipes_count == 0
+
+
+@pytest.mark.django_db
+def test_admin_author_change_moves_recipes_count(
+    media_root, admin_client, user, author, tags, make_recipes,
+):
+    recipe, = make_recipes(author, 1)
+    call_command('recount')
+    response = admin_client.post(
+        f'{ADMIN_RECIPES_URL}{recipe.pk}/change/', {
+            'name': recipe.name, 'author': user.pk, 'text': recipe.text,
+            'cooking_time': recipe.cooking_time, 'tags': [tags[0].pk],
+            'amounts-TOTAL_FORMS': 0, 'amounts-INITIAL_FORMS': 0,
+        },
+    )
+    assert response.status_code == 302, response.context['errors']
+    user.refresh_from_db()
+    author.refresh_from_db()
+    assert (user.recipes_count, author.recipes_count) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_recount_repairs_every_counter(
+    django_user_model, user, author, ingredients, make_recipes,
+):
+    first, second = make_recipes(author, 2, ingredients[:3])
+    FavoriteRecipe.objects.create(user=user, recipe=first)
+    ShoppingList.objects.create(user=user, recipe=first)
+    ShoppingList.objects.create(user=author, recipe=first)
+    Follow.objects.create(user=user, author=author)
+    Recipe.objects.update(
+        favorites_count=9, in_carts_count=9, ingredients_count=9
+    )
+    django_user_model.objects.update(recipes_count=9, followers_count=9)
+
+    call_command('recount')
+
+    assert list(Recipe.objects.order_by('id').values_list(
+        'favorites_count', 'in_carts_count', 'ingredients_count'
+    )) == [(1, 2, 3), (0, 0, 3)]
+    assert list(django_user_model.objects.order_by('id').values_list(
+        'username', 'recipes_count', 'followers_count'
+    )) == [('user', 0, 0), ('author', 2, 1)]
+
+
+@pytest.mark.django_db
+def test_api_create_and_delete_count_once(
+    media_root, author, author_client, tags, ingredients, image_data,
+):
+    response = author_client.post('/api/recipes/', {
+        'name': 'api recipe', 'text': 'text', 'cooking_time': 10,
+        'image': image_data, 'tags': [tags[0].id],
+        'ingredients': [{'id': ingredients[0].id, 'amount': 5}],
+    }, format='json')
+    assert response.status_code == 201, response.content
+    author.refresh_from_db()
+    assert author.recipes_count == 1
+    response = author_client.delete(f"/api/recipes/{response.json()['id']}/")
+    assert response.status_code == 204
+    author.refresh_from_db()
+    assert author.recipes_count == 0
@@ -0,0 +1,70 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.management.commands.csvimport import iter_json_array
+from api.models import Ingredients
+
+INGREDIENTS_URL = '/api/ingredients/'
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'ingredients.csv'
+    path.write_text('соль,г\nсахар,г\n', encoding='utf-8')
+    return path
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('batch_size', ['0', '-5'])
+def test_batch_size_must_be_positive(csv_file, batch_size):
+    with pytest.raises(CommandError, match='--batch-size'):
+        call_command('csvimport', csv_file, '--batch-size', batch_size)
+    assert not Ingredients.objects.exists()
+
+
+@pytest.mark.django_db
+def test_malformed_csv_row_reports_its_line(csv_file):
+    csv_file.write_text('соль,г\nсахар\nмука,г\n', encoding='utf-8')
+    with pytest.raises(CommandError, match='Line 2: expected 2 columns'):
+        call_command('csvimport', csv_file, '--batch-size', '1')
+
+
+@pytest.mark.django_db
+def test_import_is_idempotent(csv_file):
+    call_command('csvimport', csv_file, '--batch-size', '1')
+    call_command('csvimport', csv_file)
+    assert Ingredients.objects.count() == 2
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 1000])
+def test_json_scalars_split_across_chunks(chunk_size):
+    file = StringIO('[123, true, {"a": 4567}, null, -8.25e1]')
+    assert list(iter_json_array(file, chunk_size)) == [
+        123, True, {'a': 4567}, None, -82.5,
+    ]
+
+
+@pytest.mark.django_db
+def test_row_without_name_reports_its_number(tmp_path):
+    path = tmp_path / 'ingredients.json'
+    path.write_text(json.dumps([
+        {'name': 'соль', 'measurement_unit': 'г'},
+        {'measurement_unit': 'г'},
+    ]), encoding='utf-8')
+    with pytest.raises(CommandError, match='Row 2: expected name'):
+        call_command('csvimport', path)
+
+
+@pytest.mark.django_db
+def test_failed_import_still_refreshes_catalog(anon_client, csv_file):
+    assert anon_client.get(INGREDIENTS_URL).json() == []
+    csv_file.write_text('соль,г\nсахар\n', encoding='utf-8')
+    with pytest.raises(CommandError):
+        call_command('csvimport', csv_file, '--batch-size', '1')
+    assert [
+        ingredient['name']
+        for ingredient in anon_client.get(INGREDIENTS_URL).json()
+    ] == ['соль']
@@ -0,0 +1,80 @@
+import pytest
+
+from api.models import FavoriteRecipe, ShoppingList
+from api.views import RecipeViewSet
+
+RECIPES_URL = '/api/recipes/'
+FEED_URL = '/api/recipes/feed/'
+COOKABLE_URL = '/api/recipes/cookable/'
+FIELDSETS = (
+    {},
+    {'fields': 'id,name,author,tags'},
+    {'fields': 'name,is_favorited', 'expand': 'author,ingredients'},
+    {'fields': 'ingredients,image_variants', 'expand': 'tags'},
+)
+
+
+@pytest.fixture
+def recipes(user, author, ingredients, tags, make_recipes):
+    recipes = make_recipes(author, 3, ingredients[:4], tags[:2])
+    recipes += make_recipes(user, 2, ingredients[2:5], tags[1:], start=3)
+    FavoriteRecipe.objects.create(user=user, recipe=recipes[0])
+    ShoppingList.objects.create(user=user, recipe=recipes[1])
+    ShoppingList.objects.create(user=user, recipe=recipes[3])
+    return recipes
+
+
+def fast_and_drf(monkeypatch, request):
+    """Responses of ``request()`` with the fast and the DRF serializers."""
+    fast = request()
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            RecipeViewSet, 'get_read_serializer_class',
+            lambda self, serializer_class, fast_class: serializer_class,
+        )
+        drf = request()
+    assert fast.status_code == drf.status_code == 200, fast.content
+    return fast.content, drf.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('authenticated', [False, True])
+@pytest.mark.parametrize('params', FIELDSETS)
+def test_list_and_retrieve_match_drf(
+    monkeypatch, anon_client, user_client, recipes, authenticated, params,
+):
+    client = user_client if authenticated else anon_client
+    fast, drf = fast_and_drf(
+        monkeypatch, lambda: client.get(RECIPES_URL, params)
+    )
+    assert fast == drf
+    fast, drf = fast_and_drf(
+        monkeypatch, lambda: client.get(f'{RECIPES_URL}{recipes[0].id}/',
+                                        params)
+    )
+    assert fast == drf
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', FIELDSETS)
+def test_feed_matches_drf(monkeypatch, user_client, author, recipes, params):
+    response = user_client.post(f'/api/users/{author.id}/subscribe/')
+    assert response.status_code == 201
+    fast, drf = fast_and_drf(
+        monkeypatch, lambda: user_client.get(FEED_URL, params)
+    )
+    assert fast == drf
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('authenticated', [False, True])
+def test_cookable_matches_drf(
+    monkeypatch, anon_client, user_client, ingredients, recipes,
+    authenticated,
+):
+    client = user_client if authenticated else anon_client
+    pantry = [ingredient.id for ingredient in ingredients[:3]]
+    fast, drf = fast_and_drf(monkeypatch, lambda: client.post(
+        COOKABLE_URL, {'ingredients': pantry}, format='json'
+    ))
+    assert fast == drf
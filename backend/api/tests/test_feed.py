@@ -0,0 +1,28 @@
+import pytest
+
+FEED_URL = '/api/recipes/feed/'
+
+
+@pytest.mark.django_db
+def test_feed_pages_follow_newest_first(
+    django_user_model, user_client, author, make_recipes,
+):
+    other = django_user_model.objects.create_user(
+        username='other', email='other@foodgram.ru', password='Passw0rd!x'
+    )
+    make_recipes(author, 5)
+    make_recipes(other, 3, start=5)
+    response = user_client.post(f'/api/users/{author.id}/subscribe/')
+    assert response.status_code == 201
+
+    response = user_client.get(FEED_URL, {'limit': 2})
+    ids = []
+    while True:
+        body = response.json()
+        ids += [recipe['id'] for recipe in body['results']]
+        if not body['next']:
+            break
+        response = user_client.get(body['next'])
+    assert ids == list(
+        author.recipes.order_by('-id').values_list('id', flat=True)
+    )
@@ -0,0 +1,104 @@
+from base64 import b64encode
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image
+
+import api.constants as c
+from api.images import (ImageError, decode_base64, generate_variants,
+                        schedule_variants)
+from api.models import Recipe
+
+RECIPES_URL = '/api/recipes/'
+
+
+def recipe_data(image, ingredients, tags):
+    return {
+        'name': 'recipe', 'text': 'text', 'cooking_time': 15,
+        'image': image, 'tags': [tags[0].id],
+        'ingredients': [{'id': ingredients[0].id, 'amount': 10}],
+    }
+
+
+def png(size):
+    buffer = BytesIO()
+    Image.new('RGB', size, (40, 120, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_decode_stops_at_the_first_chunk_past_the_limit(monkeypatch):
+    monkeypatch.setattr(c, 'IMAGE_DECODE_CHUNK_SIZE', 8)
+    # The invalid tail is never reached.
+    data = 'QUFB' * 4 + '!' * 8
+    with pytest.raises(ImageError, match='too_large'):
+        decode_base64(data, max_size=6)
+    assert decode_base64('QUFB\nQU\nFB', max_size=6) == b'AAAAAA'
+
+
+@pytest.mark.django_db
+def test_oversized_upload_is_rejected(
+    monkeypatch, media_root, user_client, image_data, ingredients, tags,
+):
+    monkeypatch.setattr(c, 'IMAGE_MAX_SIZE', 32)
+    response = user_client.post(
+        RECIPES_URL, recipe_data(image_data, ingredients, tags),
+        format='json',
+    )
+    assert response.status_code == 400
+    assert response.json()['image'] == ['Image is too large.']
+    assert not Recipe.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('content', [b'not an image', b'GIF89a' + b'\0' * 16])
+def test_non_image_upload_is_rejected(
+    media_root, user_client, ingredients, tags, content,
+):
+    image = 'data:image/png;base64,' + b64encode(content).decode()
+    response = user_client.post(
+        RECIPES_URL, recipe_data(image, ingredients, tags), format='json',
+    )
+    assert response.status_code == 400
+    assert 'image' in response.json()
+    assert not Recipe.objects.exists()
+
+
+@pytest.mark.django_db
+def test_generate_variants_writes_downscaled_copies(
+    media_root, author, make_recipes,
+):
+    recipe, = make_recipes(author, 1)
+    storage = Recipe._meta.get_field('image').storage
+    image_name = storage.save('image/big.png', ContentFile(png((1200, 800))))
+    Recipe.objects.filter(pk=recipe.pk).update(image=image_name)
+
+    variants = generate_variants(recipe.pk, image_name)
+
+    assert set(variants) == set(c.IMAGE_VARIANTS)
+    for variant, expected in (
+        ('small', (320, 213)), ('medium', (960, 640)),
+    ):
+        with default_storage.open(variants[variant]) as file:
+            assert Image.open(file).size == expected
+    recipe.refresh_from_db()
+    assert recipe.image_variants == variants
+
+
+@pytest.mark.django_db
+def test_variants_are_only_queued_after_commit(
+    django_capture_on_commit_callbacks, author, make_recipes,
+):
+    recipe, = make_recipes(author, 1)
+    with django_capture_on_commit_callbacks() as callbacks:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                schedule_variants(recipe)
+                raise RuntimeError
+    assert callbacks == []
+    with django_capture_on_commit_callbacks() as callbacks:
+        with transaction.atomic():
+            schedule_variants(recipe)
+    assert len(callbacks) == 1
@@ -0,0 +1,104 @@
+import pytest
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Recipe
+from api.pagination import IdCursorPagination
+
+RECIPES_URL = '/api/recipes/'
+
+
+def walk(client, data):
+    """Follow the cursor links and return the ids of every page."""
+    response = client.get(RECIPES_URL, {**data, 'cursor': '', 'limit': 1})
+    ids = []
+    while True:
+        body = response.json()
+        ids += [recipe['id'] for recipe in body['results']]
+        if not body['next']:
+            return ids
+        response = client.get(body['next'])
+
+
+@pytest.mark.django_db
+def test_cursor_pages_keep_the_search_relevance_order(
+    anon_client, author, make_recipes,
+):
+    by_name, by_text, unrelated = make_recipes(author, 3)
+    by_name.name = 'борщ'
+    by_name.save()
+    by_text.text = 'почти борщ'
+    by_text.save()
+    pages = walk(anon_client, {'search': 'борщ'})
+    assert pages == [by_name.id, by_text.id]
+    assert pages == [
+        recipe['id'] for recipe in anon_client.get(
+            RECIPES_URL, {'search': 'борщ'}
+        ).json()['results']
+    ]
+
+
+@pytest.mark.django_db
+def test_cursor_rejects_expression_orderings():
+    request = Request(APIRequestFactory().get(RECIPES_URL, {'cursor': ''}))
+    queryset = Recipe.objects.order_by(F('cooking_time').desc())
+    with pytest.raises(ValidationError):
+        IdCursorPagination().paginate_queryset(queryset, request)
+
+
+@pytest.mark.django_db
+def test_new_recipe_shows_on_a_new_last_page(
+    media_root, anon_client, author, author_client, make_recipes,
+    image_data, ingredients, tags,
+):
+    make_recipes(author, 6)
+    assert anon_client.get(RECIPES_URL, {'limit': 6}).json()['count'] == 6
+    response = author_client.post(RECIPES_URL, {
+        'name': 'new', 'text': 'text', 'cooking_time': 15,
+        'image': image_data, 'tags': [tags[0].id],
+        'ingredients': [{'id': ingredients[0].id, 'amount': 10}],
+    }, format='json')
+    assert response.status_code == 201, response.content
+    response = anon_client.get(RECIPES_URL, {'limit': 6})
+    assert response.json()['count'] == 7
+    response = anon_client.get(RECIPES_URL, {'limit': 6, 'page': 2})
+    assert response.status_code == 200, response.content
+    assert len(response.json()['results']) == 1
+
+
+@pytest.mark.django_db
+def test_filtered_count_follows_favorites(
+    user_client, author, make_recipes,
+):
+    recipes = make_recipes(author, 7)
+    params = {'is_favorited': 1, 'limit': 6}
+    assert user_client.get(RECIPES_URL, params).json()['count'] == 0
+    for recipe in recipes:
+        response = user_client.post(f'{RECIPES_URL}{recipe.id}/favorite/')
+        assert response.status_code == 201
+    assert user_client.get(RECIPES_URL, params).json()['count'] == 7
+    response = user_client.post(
+        f'{RECIPES_URL}favorite/', {'recipes': [recipes[0].id]},
+        format='json',
+    )
+    assert response.status_code == 200
+    user_client.delete(f'{RECIPES_URL}{recipes[0].id}/favorite/')
+    assert user_client.get(RECIPES_URL, params).json()['count'] == 6
+
+
+@pytest.mark.django_db
+def test_page_past_a_stale_count_is_recounted(
+    anon_client, author, make_recipes,
+):
+    make_recipes(author, 6)
+    anon_client.get(RECIPES_URL, {'limit': 6})
+    # A bulk insert sends no signals, so the cached count stays at 6.
+    Recipe.objects.bulk_create([Recipe(
+        name='bulk', author=author, text='text', image='image/recipe.png',
+        cooking_time=10,
+    )])
+    response = anon_client.get(RECIPES_URL, {'limit': 6, 'page': 2})
+    assert response.status_code == 200, response.content
+    assert response.json()['count'] == 7
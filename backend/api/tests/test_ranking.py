@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+import api.constants as c
+from api.models import FavoriteRecipe, RecipeRanking, ShoppingList
+from api.ranking import decay, rebuild_ranking, refresh_ranking
+
+HALF_LIFE = timedelta(seconds=c.RANKING_HALF_LIFE)
+SETTLE_TIME = timedelta(seconds=c.RANKING_SETTLE_TIME)
+
+
+def add_event(model, user, recipe, created):
+    event = model.objects.create(user=user, recipe=recipe)
+    model.objects.filter(pk=event.pk).update(created=created)
+
+
+def scores():
+    return dict(RecipeRanking.objects.values_list('recipe_id', 'score'))
+
+
+def test_decay_halves_every_half_life():
+    assert decay(0) == 1
+    assert decay(-60) == 1
+    assert decay(c.RANKING_HALF_LIFE) == pytest.approx(0.5)
+    assert decay(3 * c.RANKING_HALF_LIFE) == pytest.approx(0.125)
+
+
+@pytest.mark.django_db
+def test_rank_recipes_rebuilds_decayed_scores(
+    user, author, make_recipes,
+):
+    fresh, old = make_recipes(author, 2)
+    now = timezone.now()
+    add_event(FavoriteRecipe, user, fresh, now - SETTLE_TIME)
+    add_event(ShoppingList, user, old, now - SETTLE_TIME - HALF_LIFE)
+    expected = {
+        fresh.id: c.RANKING_FAVORITE_WEIGHT,
+        old.id: c.RANKING_CART_WEIGHT / 2,
+    }
+    call_command('rank_recipes')
+    assert scores() == pytest.approx(expected, rel=1e-3)
+    call_command('rank_recipes', '--incremental')
+    assert scores() == pytest.approx(expected, rel=1e-3)
+
+
+@pytest.mark.django_db
+def test_unsettled_events_wait_for_a_later_run(user, author, make_recipes):
+    recipe, = make_recipes(author, 1)
+    now = timezone.now()
+    add_event(FavoriteRecipe, user, recipe, now - SETTLE_TIME / 2)
+    rebuild_ranking(now)
+    assert scores() == {}
+    rebuild_ranking(now + SETTLE_TIME)
+    assert recipe.id in scores()
+
+
+@pytest.mark.django_db
+def test_incremental_runs_match_a_rebuild(
+    django_user_model, user, author, make_recipes,
+):
+    recipes = make_recipes(author, 3)
+    other = django_user_model.objects.create_user(
+        username='other', email='other@foodgram.ru', password='Passw0rd!x'
+    )
+    start = timezone.now() - 3 * HALF_LIFE
+    add_event(FavoriteRecipe, user, recipes[0], start - HALF_LIFE)
+    refresh_ranking(start)
+
+    first_run = start + HALF_LIFE
+    add_event(ShoppingList, user, recipes[0], first_run - 2 * SETTLE_TIME)
+    # Created before the first run but committed after it.
+    late = first_run - SETTLE_TIME / 2
+    refresh_ranking(first_run)
+    add_event(FavoriteRecipe, other, recipes[1], late)
+
+    second_run = first_run + HALF_LIFE
+    add_event(ShoppingList, other, recipes[2], second_run - 2 * SETTLE_TIME)
+    refresh_ranking(second_run)
+    incremental = scores()
+
+    rebuild_ranking(second_run)
+    assert incremental == pytest.approx(scores())
+    assert set(incremental) == {recipe.id for recipe in recipes}
@@ -0,0 +1,131 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import AddIngredientInRec, Recipe
+
+RECIPES_URL = '/api/recipes/'
+
+
+def recipe_data(name, image, ingredients, tags, amount=10):
+    return {
+        'name': name,
+        'text': 'text',
+        'cooking_time': 15,
+        'image': image,
+        'tags': [tag.id for tag in tags],
+        'ingredients': [
+            {'id': ingredient.id, 'amount': amount}
+            for ingredient in ingredients
+        ],
+    }
+
+
+def count_queries(request, *args, **kwargs):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = request(*args, format='json', **kwargs)
+    assert response.status_code in (200, 201), response.content
+    return len(context.captured_queries), response
+
+
+@pytest.mark.django_db
+def test_create_query_count_does_not_grow_with_ingredients(
+    media_root, user_client, image_data, ingredients, tags,
+):
+    counts = [
+        count_queries(user_client.post, RECIPES_URL, recipe_data(
+            f'recipe {size}', image_data, ingredients[:size], tags[:2]
+        ))[0]
+        for size in (1, 40)
+    ]
+    assert counts[0] == counts[1]
+    assert Recipe.objects.get(name='recipe 40').amounts.count() == 40
+
+
+def update_recipe(client, recipe, image_data, before, added, tags):
+    """Update ``recipe`` from the ``before`` amounts, all of 10.
+
+    The first third of ``before`` is dropped, the next third changes to
+    20, the rest is kept, and ``added`` come in with 30.
+    """
+    third = len(before) // 3
+    data = recipe_data(recipe.name, image_data, [], tags)
+    data['ingredients'] = [
+        {'id': ingredient.id, 'amount': amount}
+        for ingredients, amount in (
+            (before[third:2 * third], 20),
+            (before[2 * third:], 10),
+            (added, 30),
+        )
+        for ingredient in ingredients
+    ]
+    return count_queries(client.put, f'{RECIPES_URL}{recipe.id}/', data)
+
+
+@pytest.fixture
+def own_recipes(user, ingredients, tags, make_recipes):
+    small, large = make_recipes(user, 2)
+    AddIngredientInRec.objects.bulk_create(
+        [AddIngredientInRec(recipe=small, ingredient=ingredient, amount=10)
+         for ingredient in ingredients[:3]]
+        + [AddIngredientInRec(recipe=large, ingredient=ingredient, amount=10)
+           for ingredient in ingredients[3:42]]
+    )
+    for recipe in (small, large):
+        recipe.tags.set(tags[:2])
+    return small, large
+
+
+@pytest.mark.django_db
+def test_update_query_count_does_not_grow_with_ingredients(
+    media_root, user_client, image_data, ingredients, tags, own_recipes,
+):
+    small, large = own_recipes
+    small_count, _ = update_recipe(
+        user_client, small, image_data, ingredients[:3], ingredients[42:43],
+        tags[1:],
+    )
+    large_count, _ = update_recipe(
+        user_client, large, image_data, ingredients[3:42],
+        ingredients[43:50], tags[1:],
+    )
+    assert small_count == large_count
+
+
+@pytest.mark.django_db
+def test_update_diffs_amounts_and_replaces_tags(
+    media_root, user_client, image_data, ingredients, tags, own_recipes,
+):
+    _, recipe = own_recipes
+    before = {
+        amount.ingredient_id: amount.id for amount in recipe.amounts.all()
+    }
+    _, response = update_recipe(
+        user_client, recipe, image_data, ingredients[3:42],
+        ingredients[43:50], tags[1:],
+    )
+    amounts = {
+        amount.ingredient_id: amount for amount in recipe.amounts.all()
+    }
+    removed = {ingredient.id for ingredient in ingredients[3:16]}
+    changed = {ingredient.id for ingredient in ingredients[16:29]}
+    kept = {ingredient.id for ingredient in ingredients[29:42]}
+    added = {ingredient.id for ingredient in ingredients[43:50]}
+    assert set(amounts) == changed | kept | added
+    assert not removed & set(amounts)
+    for ingredient_id in changed | kept:
+        assert amounts[ingredient_id].id == before[ingredient_id]
+    for ids, value in ((changed, 20), (kept, 10), (added, 30)):
+        assert {amounts[ingredient_id].amount for ingredient_id in ids} == {
+            value
+        }
+    recipe.refresh_from_db()
+    assert recipe.ingredients_count == len(amounts)
+    assert {tag['id'] for tag in response.json()['tags']} == {
+        tag.id for tag in tags[1:]
+    }
+    assert set(recipe.tags.values_list('id', flat=True)) == {
+        tag.id for tag in tags[1:]
+    }
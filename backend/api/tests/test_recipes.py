@@ -0,0 +1,73 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import FavoriteRecipe, Follow, ShoppingList
+
+RECIPES_URL = '/api/recipes/'
+
+
+def count_queries(client, url, data=None):
+    """Queries of a cold request: no cached token, page count or document."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, data)
+    assert response.status_code == 200, response.content
+    return len(context.captured_queries)
+
+
+@pytest.fixture
+def small_and_large_pages(user, author, ingredients, tags, make_recipes):
+    """Two authors: one with 2 sparse recipes, one with 12 rich ones."""
+    small = make_recipes(user, 2, ingredients[:1], tags[:1])
+    large = make_recipes(author, 12, ingredients[:8], tags, start=2)
+    Follow.objects.create(user=user, author=author)
+    for recipe in large[::2] + small:
+        FavoriteRecipe.objects.create(user=user, recipe=recipe)
+        ShoppingList.objects.create(user=user, recipe=recipe)
+    return small, large
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('authenticated', [False, True])
+def test_recipe_list_query_count_is_independent_of_page_size(
+    authenticated, user, author, anon_client, user_client,
+    small_and_large_pages,
+):
+    client = user_client if authenticated else anon_client
+    small_page = count_queries(
+        client, RECIPES_URL, {'author': user.id, 'limit': 12}
+    )
+    large_page = count_queries(
+        client, RECIPES_URL, {'author': author.id, 'limit': 12}
+    )
+    assert small_page == large_page
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('authenticated', [False, True])
+def test_recipe_detail_query_count_is_independent_of_size(
+    authenticated, anon_client, user_client, small_and_large_pages,
+):
+    client = user_client if authenticated else anon_client
+    small, large = small_and_large_pages
+    assert count_queries(client, f'{RECIPES_URL}{small[0].id}/') == (
+        count_queries(client, f'{RECIPES_URL}{large[0].id}/')
+    )
+
+
+@pytest.mark.django_db
+def test_recipe_list_reads_user_flags_from_annotations(
+    user, author, user_client, small_and_large_pages,
+):
+    small, large = small_and_large_pages
+    response = user_client.get(RECIPES_URL, {'author': author.id})
+    results = {recipe['id']: recipe for recipe in response.json()['results']}
+    favorited = {recipe.id for recipe in large[::2]}
+    for recipe_id, recipe in results.items():
+        assert recipe['author']['is_subscribed'] is True
+        assert recipe['is_favorited'] is (recipe_id in favorited)
+        assert recipe['is_in_shopping_cart'] is (recipe_id in favorited)
+        assert len(recipe['ingredients']) == 8
+        assert len(recipe['tags']) == 3
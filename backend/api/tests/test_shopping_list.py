@@ -0,0 +1,62 @@
+import time
+
+import pytest
+from django.utils.http import http_date
+
+from api.models import ShoppingList
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+@pytest.fixture
+def cart(user, author, ingredients, make_recipes):
+    recipes = make_recipes(author, 2, ingredients[:3])
+    ShoppingList.objects.create(user=user, recipe=recipes[0])
+    return recipes
+
+
+def download(client, **headers):
+    return client.get(DOWNLOAD_URL, {'format': 'txt'}, **headers)
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_deleting_an_ingredient_refreshes_the_list(
+    user_client, ingredients, cart,
+):
+    before = download(user_client)
+    assert ingredients[0].name in read(before)
+    ingredients[0].delete()
+    after = download(user_client)
+    assert after['ETag'] != before['ETag']
+    content = read(after)
+    assert ingredients[0].name not in content
+    assert ingredients[1].name in content
+
+
+@pytest.mark.django_db
+def test_last_modified_is_withheld_within_the_second_of_a_change(
+    monkeypatch, user, user_client, cart,
+):
+    monkeypatch.setattr(time, 'time', lambda: 1000.2)
+    ShoppingList.objects.create(user=user, recipe=cart[1])
+    response = download(user_client)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response
+
+    monkeypatch.setattr(time, 'time', lambda: 1001.5)
+    response = download(user_client)
+    assert response['Last-Modified'] == http_date(1000)
+    since = response['Last-Modified']
+    assert download(
+        user_client, HTTP_IF_MODIFIED_SINCE=since
+    ).status_code == 304
+
+    monkeypatch.setattr(time, 'time', lambda: 1001.7)
+    ShoppingList.objects.filter(user=user, recipe=cart[1]).delete()
+    response = download(user_client, HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response
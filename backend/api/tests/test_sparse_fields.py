@@ -0,0 +1,80 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SKIPPED_TABLES = (
+    'api_addingredientinrec', 'api_recipe_tags', 'api_favoriterecipe',
+    'api_shoppinglist', 'api_follow',
+)
+
+
+def get(client, url, params=None):
+    """Return the JSON body and the SQL of a request."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    queries = [query['sql'] for query in context.captured_queries]
+    return response.json(), queries
+
+
+def touches(queries, table):
+    return any(f'"{table}"' in sql for sql in queries)
+
+
+@pytest.fixture
+def recipe(author, ingredients, tags, make_recipes):
+    recipe, = make_recipes(author, 1, ingredients[:2], tags[:2])
+    return recipe
+
+
+@pytest.mark.django_db
+def test_left_out_fields_skip_their_queries(user_client, recipe):
+    url = f'/api/recipes/{recipe.id}/'
+    full, full_queries = get(user_client, url)
+    sparse, sparse_queries = get(user_client, url, {'fields': 'id,name'})
+    assert sparse == {'id': recipe.id, 'name': recipe.name}
+    assert len(sparse_queries) < len(full_queries)
+    for table in SKIPPED_TABLES:
+        assert not touches(sparse_queries, table), table
+    assert all(
+        touches(full_queries, table) for table in SKIPPED_TABLES
+    )
+
+
+@pytest.mark.django_db
+def test_relations_collapse_to_ids_unless_expanded(
+    user_client, author, recipe, ingredients, tags,
+):
+    url = f'/api/recipes/{recipe.id}/'
+    body, queries = get(
+        user_client, url, {'fields': 'author,ingredients,tags'}
+    )
+    assert body == {
+        'author': author.id,
+        'ingredients': [ingredient.id for ingredient in ingredients[:2]],
+        'tags': [tag.id for tag in tags[:2]],
+    }
+    assert not touches(queries, 'api_ingredients')
+    # The author stays the recipe's author_id, with no user query.
+    assert not any(sql.startswith('SELECT "users_user"') for sql in queries)
+
+    body, _ = get(
+        user_client, url, {'fields': 'name', 'expand': 'author,ingredients'}
+    )
+    assert set(body) == {'name', 'author', 'ingredients'}
+    assert body['author']['username'] == author.username
+    assert body['ingredients'][0] == {
+        'id': ingredients[0].id, 'name': ingredients[0].name,
+        'amount': 10, 'measurement_unit': ingredients[0].measurement_unit,
+    }
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_ignored(anon_client, recipe):
+    url = f'/api/recipes/{recipe.id}/'
+    body, _ = get(anon_client, url, {'fields': 'id,bogus', 'expand': 'nope'})
+    assert body == {'id': recipe.id}
+    body, _ = get(anon_client, url, {'fields': 'bogus'})
+    assert body == {}
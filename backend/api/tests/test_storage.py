@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+import api.constants as c
+from api.storage import content_addressed_storage
+
+STALE = time.time() - c.MEDIA_GC_GRACE_PERIOD - 60
+
+
+def make_stale(path):
+    os.utime(path, (STALE, STALE))
+
+
+@pytest.mark.django_db
+def test_collect_media_deletes_stale_unreferenced_files(media_root):
+    name = content_addressed_storage.save(
+        'image/orphan.png', ContentFile(b'orphan')
+    )
+    make_stale(content_addressed_storage.path(name))
+    call_command('collect_media')
+    assert not content_addressed_storage.exists(name)
+
+
+@pytest.mark.django_db
+def test_reuploaded_file_survives_collect_media(media_root):
+    name = content_addressed_storage.save(
+        'image/first.png', ContentFile(b'same image')
+    )
+    make_stale(content_addressed_storage.path(name))
+    # The same content is uploaded again, and its record is not saved
+    # yet when the collection runs.
+    assert content_addressed_storage.save(
+        'image/second.png', ContentFile(b'same image')
+    ) == name
+    call_command('collect_media')
+    assert content_addressed_storage.exists(name)
+
+
+@pytest.mark.django_db
+def test_file_collected_during_dedup_is_written_again(
+    monkeypatch, media_root,
+):
+    name = content_addressed_storage.save(
+        'image/first.png', ContentFile(b'same image')
+    )
+    exists = content_addressed_storage.exists
+
+    def collected_right_after_check(path):
+        found = exists(path)
+        os.remove(content_addressed_storage.path(path))
+        return found
+
+    monkeypatch.setattr(
+        content_addressed_storage, 'exists', collected_right_after_check
+    )
+    assert content_addressed_storage.save(
+        'image/second.png', ContentFile(b'same image')
+    ) == name
+    monkeypatch.undo()
+    with content_addressed_storage.open(name) as file:
+        assert file.read() == b'same image'
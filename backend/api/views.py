@@ -1,35 +1,77 @@
-from django.http import HttpResponse
+import time
+from io import BytesIO
+
+from django.db.models import F
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from .cache import (bump_shopping_list_version, get_catalog,
+                    get_shopping_list_document, get_shopping_list_version,
+                    invalidate_page_counts)
 from .serializers import (TagSerializer, IngredientReadSerializer,
                           FavoriteRecipeSerializer, RecipeReadSerializer,
-                          RecipeWriteSerializer, FavoriteSerializer,
-                          ShoppingCartSerializer)
+                          RecipeWriteSerializer, CookableQuerySerializer,
+                          CookableRecipeSerializer, RecipeIdsSerializer)
+from .fast_serializers import (FastCookableRecipeSerializer,
+                               FastRecipeReadSerializer)
+from .feed import fan_out
+from .sparse import Fieldset
 from .filters import IngredientNameFilter, RecipeFilter
-from .models import (Ingredients, Recipe, ShoppingList, Tag,
-                     AddIngredientInRec, FavoriteRecipe)
-from .pagination import CustomPageSizePagination
+from .models import Ingredients, Recipe, ShoppingList, Tag, FavoriteRecipe
+from .pagination import CustomPageSizePagination, IdCursorPagination
 from .permissions import AuthPostRetrieve, IsAuthorOrReadOnly
+from .renderers import SHOPPING_LIST_RENDERERS, FastJSONRenderer
+from .services import (add_recipe_relations, add_relation,
+                       get_cookable_recipes, remove_recipe_relations,
+                       remove_relation)
 import api.constants as c
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class CatalogListMixin:
+    """Serve the unfiltered JSON list from a precomputed document.
+
+    The document is kept in the cache under ``catalog_cache_key`` and
+    dropped by signals whenever the underlying model changes.
+    """
+    catalog_cache_key = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        content, etag = get_catalog(self.catalog_cache_key, self.render_list)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content, content_type=request.accepted_renderer.media_type
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=c.CATALOG_MAX_AGE)
+        return response
+
+    def render_list(self):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return FastJSONRenderer().render(serializer.data)
+
+
+class TagViewSet(CatalogListMixin, ReadOnlyModelViewSet):
+    catalog_cache_key = c.TAGS_CACHE_KEY
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
     pagination_class = None
 
 
-class IngredientsViewSet(ReadOnlyModelViewSet):
+class IngredientsViewSet(CatalogListMixin, ReadOnlyModelViewSet):
+    catalog_cache_key = c.INGREDIENTS_CACHE_KEY
     queryset = Ingredients.objects.all()
     permission_classes = AllowAny
     serializer_class = IngredientReadSerializer
@@ -44,33 +86,101 @@ class RecipeViewSet(ModelViewSet):
     pagination_class = CustomPageSizePagination
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = self.with_read_related(queryset)
+        return queryset
+
+    def with_read_related(self, queryset):
+        """Fetch only what the requested fieldset will serialize."""
+        user = self.request.user
+        fieldset = Fieldset.from_request(self.request)
+        return queryset.with_related(user, fieldset).with_user_flags(
+            user, fieldset
+        )
+
+    def get_read_serializer_class(self, serializer_class, fast_class):
+        """Use the plain-dict serializer unless the page is browsable."""
+        if self.request.accepted_renderer.format == 'json':
+            return fast_class
+        return serializer_class
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
-            return RecipeReadSerializer
+            return self.get_read_serializer_class(
+                RecipeReadSerializer, FastRecipeReadSerializer
+            )
         return RecipeWriteSerializer
 
     def perform_create(self, serializer):
-        return serializer.save(author=self.request.user)
+        recipe = serializer.save(author=self.request.user)
+        fan_out(recipe)
+        return recipe
 
     @action(
-        detail=True,
-        methods=['post', 'delete'],
-        permission_classes=[IsAuthenticated]
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        pagination_class=IdCursorPagination,
     )
-    def favorite(self, request, pk):
+    def feed(self, request):
+        """Recipes of followed authors, newest first."""
         user = request.user
-        recipe = get_object_or_404(Recipe, pk=pk)
-        data = {
-            'user': user.id,
-            'recipe': pk,
-        }
-        serializer = FavoriteSerializer(
-            data=data,
-            context={'request': request}
+        # Ordering by the feed row's recipe id rather than the recipe's
+        # own walks the (user, recipe) index backwards, so a page is
+        # read without sorting the whole feed.
+        queryset = self.filter_queryset(self.with_read_related(
+            Recipe.objects.filter(feed_items__user=user).annotate(
+                feed_position=F('feed_items__recipe_id')
+            ).order_by('-feed_position')
+        ))
+        page = self.paginate_queryset(queryset)
+        serializer_class = self.get_read_serializer_class(
+            RecipeReadSerializer, FastRecipeReadSerializer
         )
-        serializer.is_valid(raise_exception=True)
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    def cookable(self, request):
+        """Recipes ranked by how many of the posted ingredients they use."""
+        query = CookableQuerySerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+        queryset = get_cookable_recipes(
+            self.with_read_related(Recipe.objects.all()),
+            query.validated_data['ingredients'],
+            query.validated_data['min_coverage'],
+        )
+        page = self.paginate_queryset(queryset)
+        serializer_class = self.get_read_serializer_class(
+            CookableRecipeSerializer, FastCookableRecipeSerializer
+        )
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    def toggle_relation(self, request, pk, model, counter_field, errors):
+        """Add or remove the user's favorite or cart row for a recipe.
+
+        The unique constraint and the deleted row count decide the
+        outcome. The recipe is only looked up for the POST response, or
+        to tell a missing recipe from a missing row.
+        """
+        user = request.user
+        already_added, not_added = errors
         if request.method == 'POST':
-            FavoriteRecipe.objects.create(user=user, recipe=recipe)
+            recipe = get_object_or_404(Recipe, pk=pk)
+            if not add_relation(
+                model, (Recipe, recipe.pk, counter_field),
+                user=user, recipe=recipe,
+            ):
+                raise ValidationError(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [already_added]}
+                )
             serializer = FavoriteRecipeSerializer(
                 recipe,
                 context={'request': request}
@@ -79,86 +189,125 @@ class RecipeViewSet(ModelViewSet):
                 data=serializer.data,
                 status=status.HTTP_201_CREATED
             )
+        if not remove_relation(
+            model, (Recipe, pk, counter_field), user=user, recipe_id=pk
+        ):
+            get_object_or_404(Recipe, pk=pk)
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [not_added]}
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-        if request.method == 'DELETE':
-            FavoriteRecipe.objects.filter(user=user, recipe=recipe).delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+    @action(
+        detail=True,
+        methods=['post', 'delete'],
+        permission_classes=[IsAuthenticated]
+    )
+    def favorite(self, request, pk):
+        return self.toggle_relation(
+            request, pk, FavoriteRecipe, 'favorites_count',
+            ('Already in favorite', 'You have not that in your favorite'),
+        )
 
     @action(detail=True,
             methods=['post', 'delete'],
             permission_classes=[IsAuthenticated])
     def shopping_cart(self, request, pk):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        user = request.user
-        data = {
-            'user': user.id,
-            'recipe': pk,
-        }
-        serializer = ShoppingCartSerializer(
-            data=data,
-            context={'request': request}
+        return self.toggle_relation(
+            request, pk, ShoppingList, 'in_carts_count',
+            ('Already in shopping card',
+             'That recipe is not in your shopping card'),
         )
+
+    def toggle_relations(self, request, model, counter_field):
+        """Add or remove a batch of recipes and report each outcome."""
+        serializer = RecipeIdsSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
         if request.method == 'POST':
-            ShoppingList.objects.create(user=user, recipe=recipe)
-            serializer = FavoriteRecipeSerializer(
-                recipe,
-                context={'request': request}
+            results = add_recipe_relations(
+                model, counter_field, request.user, recipe_ids
             )
-            return Response(
-                data=serializer.data,
-                status=status.HTTP_201_CREATED
+        else:
+            results = remove_recipe_relations(
+                model, counter_field, request.user, recipe_ids
             )
-        if request.method == 'DELETE':
-            ShoppingList.objects.filter(user=user, recipe=recipe).delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+        # The batch insert sends no signals.
+        invalidate_page_counts()
+        return Response({'results': [
+            {'id': recipe_id, 'status': result}
+            for recipe_id, result in results.items()
+        ]})
+
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=[IsAuthenticated],
+        url_path='favorite',
+        url_name='favorite-batch',
+    )
+    def favorite_batch(self, request):
+        return self.toggle_relations(
+            request, FavoriteRecipe, 'favorites_count'
+        )
+
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=[IsAuthenticated],
+        url_path='shopping_cart',
+        url_name='shopping-cart-batch',
+    )
+    def shopping_cart_batch(self, request):
+        response = self.toggle_relations(
+            request, ShoppingList, 'in_carts_count'
+        )
+        bump_shopping_list_version(request.user.pk)
+        return response
+
+    @action(
+        detail=False,
+        methods=['delete'],
+        permission_classes=[IsAuthenticated],
+        url_path='shopping_cart/clear',
+    )
+    def clear_shopping_cart(self, request):
+        remove_recipe_relations(ShoppingList, 'in_carts_count', request.user)
+        bump_shopping_list_version(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=False,
         methods=['get'],
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        renderer_classes=SHOPPING_LIST_RENDERERS,
     )
     def download_shopping_cart(self, request):
         user = request.user
-        shopping_cart = user.is_in_shopping_cart.all()
-        shopping_list = {}
-        for item in shopping_cart:
-            recipe = item.recipe
-            ingredients = AddIngredientInRec.objects.filter(recipe=recipe)
-            for ingredient in ingredients:
-                name = ingredient.ingredient.name
-                measurement_unit = ingredient.ingredient.measurement_unit
-                amount = ingredient.amount
-                if name not in shopping_list:
-                    shopping_list[name] = {
-                        'measurement_unit': measurement_unit,
-                        'amount': amount
-                    }
-                else:
-                    shopping_list[name]['amount'] += amount
-        file_name = c.FILE_NAME
-        doc_title = c.DOC_TITLE
-        title = c.TITLE
-        sub_title = f'{timezone.now().date()}'
-        response = HttpResponse(content_type='application/pdf')
-        content_disposition = f'attachment; filename="{file_name}.pdf"'
-        response['Content-Disposition'] = content_disposition
-        pdf = canvas.Canvas(response)
-        pdf.setTitle(doc_title)
-        pdfmetrics.registerFont(TTFont('Dej', 'DejaVuSans.ttf'))
-        pdf.setFont('Dej', c.FONT_SIZE_TITLE)
-        pdf.drawCentredString(c.X_FOR_TITLE, c.Y_FOR_TITLE, title)
-        pdf.setFont('Dej', c.FONT_SIZE_SUB_TITLE)
-        pdf.drawCentredString(c.X_FOR_SUB_TITLE, c.Y_FOR_SUB_TITLE, sub_title)
-        pdf.line(c.X1, c.Y1, c.X2, c.Y2)
-        height = c.Y_FOR_INGREDIENTS
-        for name, data in shopping_list.items():
-            pdf.drawString(
-                50,
-                height,
-                f"{name} - {data['amount']} {data['measurement_unit']}"
+        renderer = request.accepted_renderer
+        version = get_shopping_list_version(user.pk)
+        etag = quote_etag(f'{user.pk}-{version}-{renderer.format}')
+        # Last-Modified only has one-second precision. Until the second
+        # of the last change is over, another change could land in the
+        # same second, so the date is neither sent nor compared.
+        last_modified = int(version)
+        if last_modified >= int(time.time()):
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = FileResponse(
+                BytesIO(get_shopping_list_document(user, renderer, version)),
+                as_attachment=True,
+                filename=f'{c.FILE_NAME}.{renderer.format}',
+                content_type=content_type,
             )
-            height -= 25
-        pdf.showPage()
-        pdf.save()
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
         return response
@@ -0,0 +1,102 @@
+"""Shared fixtures for the benchmarks.
+
+Benchmarks are deselected by default. Run them with::
+
+    python -m pytest -m benchmark benchmarks/
+
+``BENCHMARK_SCALE`` multiplies the size of the generated data sets, so
+``BENCHMARK_SCALE=100`` turns a 10k-recipe data set into a 1M one.
+"""
+import os
+import statistics
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SCALE = float(os.getenv('BENCHMARK_SCALE', 1))
+REPEAT = int(os.getenv('BENCHMARK_REPEAT', 5))
+
+results = {}
+
+
+def scaled(size):
+    return max(1, int(size * SCALE))
+
+
+class Benchmark:
+    """Collects the measurements of one benchmark for the summary."""
+
+    def __init__(self, name):
+        self.rows = results.setdefault(name, [])
+
+    def record(self, label, value, unit):
+        self.rows.append((label, value, unit))
+
+    def time(self, label, func, repeat=REPEAT, cold=True):
+        """Run ``func`` ``repeat`` times and record the median duration.
+
+        With ``cold`` the cache is cleared before every run, so cached
+        documents, tokens and page counts are rebuilt each time.
+        """
+        timings = []
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            started = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - started)
+        self.record(label, statistics.median(timings) * 1000, 'ms')
+        return result
+
+    def rate(self, label, func, number=200):
+        """Record how many calls of a warm ``func`` run per second."""
+        func()
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        rate = number / (time.perf_counter() - started)
+        self.record(label, rate, 'calls/s')
+        return rate
+
+    def explain(self, label, queryset):
+        """Record the database's plan for ``queryset``."""
+        self.record(label, queryset.explain(), 'plan')
+
+    def queries(self, label, func):
+        """Record and return the number of queries of a cold ``func``."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            func()
+        count = len(context.captured_queries)
+        self.record(label, count, 'queries')
+        return count
+
+
+@pytest.fixture(name='scaled')
+def scaled_fixture():
+    return scaled
+
+
+@pytest.fixture
+def benchmark(request):
+    return Benchmark(request.node.name)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not results:
+        return
+    terminalreporter.section('benchmarks')
+    for name, rows in results.items():
+        terminalreporter.write_line(name)
+        for label, value, unit in rows:
+            if isinstance(value, str):
+                terminalreporter.write_line(f'    {label} ({unit}):')
+                for line in value.splitlines():
+                    terminalreporter.write_line(f'        {line}')
+                continue
+            terminalreporter.write_line(
+                f'    {label:<48} {value:>12.2f} {unit}'
+            )
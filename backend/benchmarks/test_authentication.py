@@ -0,0 +1,27 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+ME_URL = '/api/users/me/'
+
+
+def test_authenticated_throughput(benchmark, user_client):
+    def request():
+        response = user_client.get(ME_URL)
+        assert response.status_code == 200
+
+    def uncached_request():
+        cache.clear()
+        request()
+
+    benchmark.queries('uncached token: queries', request)
+    with CaptureQueriesContext(connection) as context:
+        request()
+    benchmark.record(
+        'cached token: queries', len(context.captured_queries), 'queries'
+    )
+    benchmark.rate('uncached token', uncached_request)
+    benchmark.rate('cached token', request)
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from django.conf import settings
+
+from api.autocomplete import ingredient_index, search_ingredients
+from api.models import Ingredients, Tag
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+INGREDIENTS_URL = '/api/ingredients/'
+TAGS_URL = '/api/tags/'
+QUERIES = ('а', 'мо', 'сыр', 'масло', 'соус томатный', 'нет такого')
+
+
+@pytest.fixture
+def shipped_ingredients():
+    with open(settings.BASE_DIR / 'data' / 'ingredients.json') as file:
+        Ingredients.objects.bulk_create(
+            Ingredients(**ingredient) for ingredient in json.load(file)
+        )
+    ingredient_index.invalidate()
+    return Ingredients.objects.count()
+
+
+def test_ingredient_autocomplete_latency(
+    benchmark, anon_client, shipped_ingredients,
+):
+    benchmark.record('ingredients loaded', shipped_ingredients, 'rows')
+    benchmark.time(
+        'index build', lambda: (
+            ingredient_index.invalidate(), ingredient_index.search('а', 1)
+        ),
+    )
+    for query in QUERIES:
+        benchmark.time(
+            f'{query!r}: ranked, capped search',
+            lambda: list(search_ingredients(Ingredients.objects.all(), query)),
+            cold=False,
+        )
+        benchmark.time(
+            f'{query!r}: unranked icontains (before)',
+            lambda: list(Ingredients.objects.filter(name__icontains=query)),
+            cold=False,
+        )
+        response = benchmark.time(
+            f'{query!r}: request',
+            lambda: anon_client.get(INGREDIENTS_URL, {'name': query}),
+            cold=False,
+        )
+        assert response.status_code == 200
+
+
+def test_catalog_requests_per_second(
+    benchmark, anon_client, shipped_ingredients,
+):
+    Tag.objects.bulk_create(
+        Tag(name=f'tag {number}', slug=f'tag-{number}')
+        for number in range(10)
+    )
+    for url in (TAGS_URL, INGREDIENTS_URL):
+        cached = anon_client.get(url)
+        # Any query parameter bypasses the cached document.
+        serialized = anon_client.get(url, {'format': 'json'})
+        assert cached.content == serialized.content
+        benchmark.rate(
+            f'{url}: cached document', lambda: anon_client.get(url)
+        )
+        benchmark.rate(
+            f'{url}: serialized per request (before)',
+            lambda: anon_client.get(url, {'format': 'json'}),
+            number=20,
+        )
+        benchmark.rate(
+            f'{url}: revalidated with If-None-Match',
+            lambda: anon_client.get(url, HTTP_IF_NONE_MATCH=cached['ETag']),
+        )
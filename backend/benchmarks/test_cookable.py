@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from api.models import AddIngredientInRec, Ingredients, Recipe
+from api.services import get_cookable_recipes
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+COOKABLE_URL = '/api/recipes/cookable/'
+INGREDIENTS = 1000
+PER_RECIPE = 20
+PAGE_SIZE = 6
+
+
+@pytest.fixture
+def cookable_recipes(author, scaled):
+    """``scaled(10_000)`` recipes of 20 random ingredients each."""
+    size = scaled(10_000)
+    choices = random.Random(0)
+    Ingredients.objects.bulk_create(
+        Ingredients(name=f'ingredient {number}', measurement_unit='g')
+        for number in range(INGREDIENTS)
+    )
+    ingredient_ids = list(Ingredients.objects.values_list('id', flat=True))
+    for start in range(0, size, 10_000):
+        Recipe.objects.bulk_create(
+            Recipe(
+                name=f'recipe {number}', author=author, text='text',
+                image='image/recipe.png', cooking_time=10,
+                ingredients_count=PER_RECIPE,
+            )
+            for number in range(start, min(start + 10_000, size))
+        )
+    recipe_ids = Recipe.objects.values_list('id', flat=True).iterator()
+    batch = []
+    for recipe_id in recipe_ids:
+        batch.extend(
+            AddIngredientInRec(
+                recipe_id=recipe_id, ingredient_id=ingredient_id, amount=1
+            )
+            for ingredient_id in choices.sample(ingredient_ids, PER_RECIPE)
+        )
+        if len(batch) >= 50_000:
+            AddIngredientInRec.objects.bulk_create(batch)
+            batch = []
+    AddIngredientInRec.objects.bulk_create(batch)
+    return size, ingredient_ids
+
+
+def cookable_in_python(ingredient_ids, min_coverage=0):
+    """The naive per-recipe loop, for comparison."""
+    pantry = set(ingredient_ids)
+    ranked = []
+    for recipe in Recipe.objects.prefetch_related('amounts'):
+        required = {amount.ingredient_id for amount in recipe.amounts.all()}
+        matched = len(required & pantry)
+        if not matched:
+            continue
+        coverage = matched / len(required)
+        if coverage >= min_coverage:
+            ranked.append((-coverage, -matched, -recipe.id))
+    ranked.sort()
+    return [-recipe_id for _, _, recipe_id in ranked]
+
+
+def test_cookable_latency(benchmark, anon_client, cookable_recipes):
+    size, ingredient_ids = cookable_recipes
+    benchmark.record('recipes', size, 'rows')
+    benchmark.record('ingredient rows', size * PER_RECIPE, 'rows')
+    pantry = random.Random(1).sample(ingredient_ids, 100)
+    for min_coverage in (0, 0.2):
+        label = f'min_coverage {min_coverage}'
+        expected = benchmark.time(
+            f'{label}: python loop, first page',
+            lambda: cookable_in_python(pantry, min_coverage)[:PAGE_SIZE],
+            repeat=1,
+        )
+        ids = benchmark.time(
+            f'{label}: grouped query, first page',
+            lambda: list(get_cookable_recipes(
+                Recipe.objects.all(), pantry, min_coverage
+            ).values_list('id', flat=True)[:PAGE_SIZE]),
+        )
+        assert ids == expected
+        response = benchmark.time(
+            f'{label}: request', lambda: anon_client.post(
+                COOKABLE_URL,
+                {'ingredients': pantry, 'min_coverage': min_coverage},
+                format='json',
+            ),
+        )
+        assert response.status_code == 200
+    benchmark.explain(
+        'grouped query plan',
+        get_cookable_recipes(Recipe.objects.all(), pantry)[:PAGE_SIZE],
+    )
@@ -0,0 +1,85 @@
+import pytest
+from django.db.models import F
+
+from api.models import FeedItem, Follow, Recipe
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+FEED_URL = '/api/recipes/feed/'
+PAGE_SIZE = 6
+RECIPES_PER_AUTHOR = 5
+
+
+@pytest.fixture
+def followed_authors(django_user_model, user, scaled):
+    size = scaled(1000)
+    django_user_model.objects.bulk_create(
+        django_user_model(
+            username=f'author{number}', email=f'author{number}@foodgram.ru'
+        )
+        for number in range(size)
+    )
+    authors = list(django_user_model.objects.filter(
+        username__startswith='author'
+    ))
+    Follow.objects.bulk_create(
+        Follow(user=user, author=author) for author in authors
+    )
+    # Unfollowed authors make the join filter out rows too.
+    django_user_model.objects.bulk_create(
+        django_user_model(
+            username=f'other{number}', email=f'other{number}@foodgram.ru'
+        )
+        for number in range(size)
+    )
+    others = list(django_user_model.objects.filter(
+        username__startswith='other'
+    ))
+    Recipe.objects.bulk_create(
+        Recipe(
+            name=f'recipe {author.username} {number}', author=author,
+            text='text', image='image/recipe.png', cooking_time=10,
+        )
+        for number in range(RECIPES_PER_AUTHOR)
+        for author in authors + others
+    )
+    FeedItem.objects.bulk_create(
+        FeedItem(user=user, recipe_id=recipe_id, author_id=author_id)
+        for recipe_id, author_id in Recipe.objects.filter(
+            author__in=authors
+        ).values_list('id', 'author_id')
+    )
+    return authors
+
+
+def test_feed_against_join(benchmark, user, user_client, followed_authors):
+    benchmark.record('followed authors', len(followed_authors), 'users')
+    feed = Recipe.objects.filter(feed_items__user=user).annotate(
+        feed_position=F('feed_items__recipe_id')
+    ).order_by('-feed_position')
+    joined = Recipe.objects.filter(
+        author__who_are_subscribed__user=user
+    ).order_by('-id')
+    for label, queryset in (
+        ('feed rows', feed),
+        ('feed rows sorted by recipe id', feed.order_by('-id')),
+        ('follow join (before)', joined),
+    ):
+        first = benchmark.time(
+            f'first page: {label}',
+            lambda: list(queryset.values_list('id', flat=True)[:PAGE_SIZE]),
+        )
+        benchmark.time(
+            f'page 100: {label}',
+            lambda: list(queryset.values_list('id', flat=True)[
+                PAGE_SIZE * 99:PAGE_SIZE * 100
+            ]),
+        )
+        benchmark.explain(f'first page: {label}', queryset[:PAGE_SIZE])
+    assert first == list(feed.values_list('id', flat=True)[:PAGE_SIZE])
+    response = benchmark.time(
+        'feed request', lambda: user_client.get(
+            FEED_URL, {'limit': PAGE_SIZE}
+        ),
+    )
+    assert [recipe['id'] for recipe in response.json()['results']] == first
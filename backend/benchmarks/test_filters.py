@@ -0,0 +1,98 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import RecipeFilter
+from api.models import FavoriteRecipe, Recipe, ShoppingList, Tag
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+RECIPES_URL = '/api/recipes/'
+PAGE_SIZE = 6
+FILTERS = (
+    ('2 tags', {'tags': ['tag-0', 'tag-1']}),
+    ('2 tags, all', {'tags': ['tag-0', 'tag-1'], 'tags_mode': 'all'}),
+    ('2 tags + favorited', {'tags': ['tag-0', 'tag-1'], 'is_favorited': 1}),
+    ('2 tags + favorited + cart', {
+        'tags': ['tag-0', 'tag-1'], 'is_favorited': 1,
+        'is_in_shopping_cart': 1,
+    }),
+)
+
+
+def filter_recipes(user, params):
+    request = Request(APIRequestFactory().get(RECIPES_URL, params))
+    request.user = user
+    return RecipeFilter(
+        request.query_params,
+        queryset=Recipe.objects.order_by('-id'),
+        request=request,
+    ).qs
+
+
+def filter_recipes_with_joins(user, params):
+    """The filters as they were: joins, each followed by DISTINCT."""
+    queryset = Recipe.objects.filter(
+        tags__slug__in=params['tags']
+    ).distinct()
+    if params.get('is_favorited'):
+        queryset = queryset.filter(is_favorited__user=user).distinct()
+    if params.get('is_in_shopping_cart'):
+        queryset = queryset.filter(is_in_shopping_cart__user=user).distinct()
+    return queryset.order_by('-id')
+
+
+def fetch_page(queryset):
+    return queryset.count(), list(
+        queryset.values_list('id', flat=True)[:PAGE_SIZE]
+    )
+
+
+@pytest.fixture
+def tagged_recipes(user, author, scaled):
+    size = scaled(20_000)
+    tags = [
+        Tag.objects.create(name=f'tag {number}', slug=f'tag-{number}')
+        for number in range(8)
+    ]
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            name=f'recipe {number}', author=author, text='text',
+            image='image/recipe.png', cooking_time=10,
+        )
+        for number in range(size)
+    )
+    ids = list(Recipe.objects.values_list('id', flat=True))
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(
+            recipe_id=recipe_id, tag=tags[(number + shift) % len(tags)]
+        )
+        for number, recipe_id in enumerate(ids)
+        for shift in (0, 1, 3)
+    )
+    FavoriteRecipe.objects.bulk_create(
+        FavoriteRecipe(user=user, recipe_id=recipe_id)
+        for recipe_id in ids[::10]
+    )
+    ShoppingList.objects.bulk_create(
+        ShoppingList(user=user, recipe_id=recipe_id)
+        for recipe_id in ids[::20]
+    )
+    return recipes
+
+
+def test_combined_filters(benchmark, user, tagged_recipes):
+    benchmark.record('recipes', len(tagged_recipes), 'rows')
+    for label, params in FILTERS:
+        queryset = filter_recipes(user, params)
+        page = benchmark.time(
+            f'{label}: Exists()', lambda: fetch_page(queryset)
+        )
+        if params.get('tags_mode') != 'all':
+            joined = filter_recipes_with_joins(user, params)
+            assert benchmark.time(
+                f'{label}: joins + DISTINCT (before)',
+                lambda: fetch_page(joined),
+            ) == page
+            benchmark.explain(f'{label}: joins + DISTINCT (before)', joined)
+        benchmark.explain(f'{label}: Exists()', queryset)
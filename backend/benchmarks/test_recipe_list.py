@@ -0,0 +1,55 @@
+from base64 import b64encode
+from urllib.parse import urlencode
+
+import pytest
+
+from api.models import Recipe
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+RECIPES_URL = '/api/recipes/'
+PAGE_SIZE = 6
+
+
+def encode_cursor(position):
+    """A cursor pointing just past the recipe with id ``position``."""
+    return b64encode(urlencode({'p': position}).encode()).decode()
+
+
+@pytest.fixture
+def many_recipes(author, scaled):
+    size = scaled(10_000)
+    for start in range(0, size, 10_000):
+        Recipe.objects.bulk_create(
+            Recipe(
+                name=f'recipe {number}', author=author, text='text',
+                image='image/recipe.png', cooking_time=10,
+            )
+            for number in range(start, min(start + 10_000, size))
+        )
+    return list(Recipe.objects.order_by('-id').values_list('id', flat=True))
+
+
+def test_page_latency_at_depth(benchmark, anon_client, many_recipes):
+    benchmark.record('recipes', len(many_recipes), 'rows')
+    pages = len(many_recipes) // PAGE_SIZE
+    for depth in (0, 0.25, 0.5, 1):
+        page = max(1, int(pages * depth))
+        offset = (page - 1) * PAGE_SIZE
+        response = benchmark.time(
+            f'page {page}: page number',
+            lambda: anon_client.get(
+                RECIPES_URL, {'page': page, 'limit': PAGE_SIZE}
+            ),
+        )
+        expected = [recipe['id'] for recipe in response.json()['results']]
+        cursor = {'cursor': '', 'limit': PAGE_SIZE}
+        if offset:
+            cursor['cursor'] = encode_cursor(many_recipes[offset - 1])
+        response = benchmark.time(
+            f'page {page}: cursor',
+            lambda: anon_client.get(RECIPES_URL, cursor),
+        )
+        assert [
+            recipe['id'] for recipe in response.json()['results']
+        ] == expected
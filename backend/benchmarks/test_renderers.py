@@ -0,0 +1,40 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Recipe
+from api.renderers import FastJSONRenderer
+from api.serializers import RecipeReadSerializer
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+PAGE_SIZES = (6, 50, 500)
+
+
+@pytest.fixture
+def recipe_pages(author, ingredients, tags, make_recipes):
+    make_recipes(author, max(PAGE_SIZES), ingredients[:10], tags)
+    request = Request(APIRequestFactory().get('/api/recipes/'))
+    request.user = author
+    recipes = Recipe.objects.with_related(author).with_user_flags(author)
+    return {
+        size: RecipeReadSerializer(
+            recipes.order_by('-id')[:size], many=True,
+            context={'request': request},
+        ).data
+        for size in PAGE_SIZES
+    }
+
+
+def test_render_recipe_pages(benchmark, recipe_pages):
+    for size, data in recipe_pages.items():
+        content = benchmark.time(
+            f'{size} recipes: DRF JSONRenderer',
+            lambda: JSONRenderer().render(data), cold=False,
+        )
+        assert benchmark.time(
+            f'{size} recipes: orjson renderer',
+            lambda: FastJSONRenderer().render(data), cold=False,
+        ) == content
+        benchmark.record(f'{size} recipes: size', len(content), 'bytes')
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+from django.db.models import Q
+
+from api.models import AddIngredientInRec, Ingredients, Recipe
+from api.search import recipe_index, search_recipes
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+RECIPES_URL = '/api/recipes/'
+WORDS = (
+    'борщ', 'суп', 'салат', 'пирог', 'каша', 'котлеты', 'омлет', 'рагу',
+    'плов', 'блины', 'запеканка', 'соус', 'торт', 'паста', 'жаркое',
+)
+QUERIES = ('борщ', 'салат свекла', 'пирог яблоко корица', 'несуществующее')
+
+
+@pytest.fixture
+def searchable_recipes(author, scaled):
+    words = random.Random(0)
+    size = scaled(10_000)
+    Ingredients.objects.bulk_create(
+        Ingredients(name=name, measurement_unit='g') for name in (
+            'свекла', 'яблоко', 'корица', 'мука', 'рис', 'морковь',
+            'лук', 'сыр', 'молоко', 'яйцо',
+        )
+    )
+    ingredients = list(Ingredients.objects.all())
+    Recipe.objects.bulk_create(
+        Recipe(
+            name=f'{words.choice(WORDS)} {number}',
+            text=' '.join(words.choices(WORDS, k=20)),
+            author=author, image='image/recipe.png', cooking_time=10,
+        )
+        for number in range(size)
+    )
+    AddIngredientInRec.objects.bulk_create(
+        AddIngredientInRec(recipe_id=recipe_id, ingredient=ingredient,
+                           amount=1)
+        for recipe_id in Recipe.objects.values_list('id', flat=True)
+        for ingredient in words.sample(ingredients, 3)
+    )
+    recipe_index.invalidate()
+    return size
+
+
+def search_with_icontains(query):
+    """Unranked substring matching of every word, for comparison."""
+    queryset = Recipe.objects.all()
+    for word in query.split():
+        queryset = queryset.filter(
+            Q(name__icontains=word) | Q(text__icontains=word)
+            | Q(ingredients__name__icontains=word)
+        )
+    return queryset.distinct().order_by('-id')
+
+
+def test_search_latency(benchmark, anon_client, searchable_recipes):
+    benchmark.record('recipes', searchable_recipes, 'rows')
+    benchmark.time(
+        'index build', lambda: (
+            recipe_index.invalidate(), recipe_index.search('борщ')
+        ),
+    )
+    for query in QUERIES:
+        benchmark.time(
+            f'{query!r}: ranked search, first page',
+            lambda: list(search_recipes(
+                Recipe.objects.all(), query
+            ).values_list('id', flat=True)[:6]),
+            cold=False,
+        )
+        benchmark.time(
+            f'{query!r}: icontains scan, first page',
+            lambda: list(search_with_icontains(
+                query
+            ).values_list('id', flat=True)[:6]),
+            cold=False,
+        )
+        response = benchmark.time(
+            f'{query!r}: request', lambda: anon_client.get(
+                RECIPES_URL, {'search': query}
+            ), cold=False,
+        )
+        assert response.status_code == 200
@@ -0,0 +1,45 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.fast_serializers import FastRecipeReadSerializer
+from api.models import Recipe
+from api.serializers import RecipeReadSerializer
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+PAGE_SIZES = (6, 50, 500)
+
+
+@pytest.fixture
+def recipe_pages(author, ingredients, tags, make_recipes):
+    make_recipes(author, max(PAGE_SIZES), ingredients[:10], tags)
+    recipes = Recipe.objects.with_related(author).with_user_flags(author)
+    return {
+        size: list(recipes.order_by('-id')[:size]) for size in PAGE_SIZES
+    }
+
+
+def test_serializer_throughput(benchmark, author, recipe_pages):
+    request = Request(APIRequestFactory().get('/api/recipes/'))
+    request.user = author
+    context = {'request': request}
+    for size, page in recipe_pages.items():
+        rates = {}
+        for name, serializer_class in (
+            ('DRF serializer', RecipeReadSerializer),
+            ('fast serializer', FastRecipeReadSerializer),
+        ):
+            rates[name] = benchmark.rate(
+                f'{size} recipes: {name}',
+                lambda: serializer_class(
+                    page, many=True, context=context
+                ).data,
+                number=max(1, 1000 // size),
+            )
+            benchmark.record(
+                f'{size} recipes: {name}', rates[name] * size, 'rows/s'
+            )
+        assert FastRecipeReadSerializer(
+            page, many=True, context=context
+        ).data == RecipeReadSerializer(page, many=True, context=context).data
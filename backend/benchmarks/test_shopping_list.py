@@ -0,0 +1,172 @@
+import tracemalloc
+from io import BytesIO
+
+import pytest
+from django.db.models import Sum
+from django.utils import timezone
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from api.models import AddIngredientInRec, Recipe, ShoppingList
+from api.pdf import get_font_name, render_shopping_list
+from api.renderers import SHOPPING_LIST_RENDERERS
+from api.services import get_shopping_list
+import api.constants as c
+
+pytestmark = pytest.mark.benchmark
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+CART_SIZES = (1, 10, 100, 500)
+LIST_SIZES = (10, 100, 1000)
+
+
+def get_shopping_list_per_recipe(user):
+    """The aggregation as it was done before: queries per cart recipe."""
+    shopping_list = {}
+    for item in user.is_in_shopping_cart.all():
+        for amount in AddIngredientInRec.objects.filter(recipe=item.recipe):
+            name = amount.ingredient.name
+            if name not in shopping_list:
+                shopping_list[name] = {
+                    'measurement_unit': amount.ingredient.measurement_unit,
+                    'amount': amount.amount,
+                }
+            else:
+                shopping_list[name]['amount'] += amount.amount
+    return shopping_list
+
+
+@pytest.fixture
+def fill_cart(user, author, ingredients, make_recipes):
+    def fill(size):
+        ShoppingList.objects.filter(user=user).delete()
+        recipes = make_recipes(
+            author, size, ingredients[:10], start=Recipe.objects.count()
+        )
+        ShoppingList.objects.bulk_create(
+            ShoppingList(user=user, recipe=recipe) for recipe in recipes
+        )
+    return fill
+
+
+def render_shopping_list_inline(shopping_list):
+    """The PDF as it was drawn before: the font is parsed on every call."""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.setTitle(c.DOC_TITLE)
+    pdfmetrics.registerFont(TTFont(c.FONT_NAME, c.FONT_FILE))
+    pdf.setFont(c.FONT_NAME, c.FONT_SIZE_TITLE)
+    pdf.drawCentredString(c.X_FOR_TITLE, c.Y_FOR_TITLE, c.TITLE)
+    pdf.setFont(c.FONT_NAME, c.FONT_SIZE_SUB_TITLE)
+    pdf.drawCentredString(
+        c.X_FOR_SUB_TITLE, c.Y_FOR_SUB_TITLE, f'{timezone.now().date()}'
+    )
+    pdf.line(c.X1, c.Y1, c.X2, c.Y2)
+    height = c.Y_FOR_INGREDIENTS
+    for item in shopping_list:
+        pdf.drawString(
+            c.X_FOR_INGREDIENTS, height,
+            f"{item['ingredient__name']} - {item['total_amount']} "
+            f"{item['ingredient__measurement_unit']}"
+        )
+        height -= c.LINE_HEIGHT
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def make_shopping_list(size):
+    return [
+        {
+            'ingredient__name': f'ingredient {number}',
+            'ingredient__measurement_unit': 'g',
+            'total_amount': number * 10,
+        }
+        for number in range(size)
+    ]
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_pdf_rendering_latency_and_memory(benchmark):
+    if get_font_name() != c.FONT_NAME:
+        pytest.skip(f'{c.FONT_FILE} is not installed')
+    for size in LIST_SIZES:
+        shopping_list = make_shopping_list(size)
+        for label, render in (
+            ('font registered once', render_shopping_list),
+            ('font parsed per call (before)', render_shopping_list_inline),
+        ):
+            benchmark.time(
+                f'{size} lines: {label}', lambda: render(shopping_list)
+            )
+            benchmark.record(
+                f'{size} lines: {label}',
+                peak_memory(lambda: render(shopping_list)) / 1024,
+                'KiB peak',
+            )
+
+
+@pytest.mark.django_db
+def test_shopping_list_query_count_is_constant(
+    benchmark, user, user_client, fill_cart,
+):
+    counts = set()
+    for size in CART_SIZES:
+        fill_cart(size)
+        counts.add(benchmark.queries(
+            f'cart of {size}: grouped query',
+            lambda: list(get_shopping_list(user)),
+        ))
+        benchmark.queries(
+            f'cart of {size}: per-recipe queries (before)',
+            lambda: get_shopping_list_per_recipe(user),
+        )
+        benchmark.queries(
+            f'cart of {size}: download request',
+            lambda: user_client.get(DOWNLOAD_URL, {'format': 'txt'}),
+        )
+        benchmark.time(
+            f'cart of {size}: grouped query',
+            lambda: list(get_shopping_list(user)),
+        )
+        benchmark.time(
+            f'cart of {size}: per-recipe queries (before)',
+            lambda: get_shopping_list_per_recipe(user),
+        )
+        totals = AddIngredientInRec.objects.filter(
+            recipe__is_in_shopping_cart__user=user
+        ).aggregate(total=Sum('amount'))['total']
+        assert sum(
+            item['total_amount'] for item in get_shopping_list(user)
+        ) == totals
+    assert len(counts) == 1
+
+
+@pytest.mark.django_db
+def test_download_latency_per_format(
+    benchmark, user, user_client, author, ingredients, make_recipes,
+):
+    ShoppingList.objects.bulk_create(
+        ShoppingList(user=user, recipe=recipe)
+        for recipe in make_recipes(author, 20, ingredients)
+    )
+    for renderer in SHOPPING_LIST_RENDERERS:
+        def download():
+            return user_client.get(DOWNLOAD_URL, {'format': renderer.format})
+
+        response = benchmark.time(f'{renderer.format}: cold', download)
+        assert response.status_code == 200
+        benchmark.record(
+            f'{renderer.format}: size',
+            len(b''.join(response.streaming_content)) / 1024, 'KiB',
+        )
+        benchmark.time(f'{renderer.format}: cached', download, cold=False)
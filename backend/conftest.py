@@ -0,0 +1,134 @@
+from base64 import b64encode
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.cache import caches
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.autocomplete import ingredient_index
+from api.models import AddIngredientInRec, Ingredients, Recipe, Tag
+from api.search import recipe_index
+
+
+@pytest.fixture(autouse=True)
+def local_memory_caches(settings):
+    """Run every test against fresh local-memory caches."""
+    settings.CACHES = {
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        for alias in settings.CACHES
+    }
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def image_data():
+    """A small PNG as the base64 data URI the recipe form sends."""
+    buffer = BytesIO()
+    Image.new('RGB', (16, 16), (200, 40, 40)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    """Drop the in-process search indexes built by earlier tests."""
+    ingredient_index.invalidate()
+    recipe_index.invalidate()
+
+
+def make_client(user=None):
+    client = APIClient()
+    if user is not None:
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+@pytest.fixture(name='make_client')
+def make_client_fixture():
+    return make_client
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='user', email='user@foodgram.ru', password='Passw0rd!x'
+    )
+
+
+@pytest.fixture
+def author(django_user_model):
+    return django_user_model.objects.create_user(
+        username='author', email='author@foodgram.ru', password='Passw0rd!x'
+    )
+
+
+@pytest.fixture
+def anon_client():
+    return make_client()
+
+
+@pytest.fixture
+def user_client(user):
+    return make_client(user)
+
+
+@pytest.fixture
+def author_client(author):
+    return make_client(author)
+
+
+@pytest.fixture
+def ingredients():
+    Ingredients.objects.bulk_create(
+        Ingredients(name=f'ingredient {number}', measurement_unit='g')
+        for number in range(50)
+    )
+    return list(Ingredients.objects.order_by('id'))
+
+
+@pytest.fixture
+def tags():
+    return [
+        Tag.objects.create(name=f'tag {number}', slug=f'tag-{number}')
+        for number in range(3)
+    ]
+
+
+def create_recipes(author, count, ingredients=(), tags=(), start=0):
+    """Create ``count`` recipes, each using all given ingredients and tags."""
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            name=f'recipe {number}', author=author, text='text',
+            image='image/recipe.png', cooking_time=10,
+            ingredients_count=len(ingredients),
+        )
+        for number in range(start, start + count)
+    )
+    recipes = list(Recipe.objects.filter(
+        name__in=[recipe.name for recipe in recipes]
+    ).order_by('id'))
+    AddIngredientInRec.objects.bulk_create(
+        AddIngredientInRec(recipe=recipe, ingredient=ingredient, amount=10)
+        for recipe in recipes
+        for ingredient in ingredients
+    )
+    for recipe in recipes:
+        recipe.tags.set(tags)
+    return recipes
+
+
+@pytest.fixture
+def make_recipes():
+    return create_recipes
@@ -0,0 +1,51 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+TOKEN_CACHE_TIMEOUT = 5 * 60
+# Kept up to date with F() expressions, so the cached user must neither
+# show nor save possibly stale values of these.
+USER_COUNTER_FIELDS = ('recipes_count', 'followers_count')
+
+
+def get_token_cache_key(key):
+    return 'auth_token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_tokens(*keys):
+    cache.delete_many([get_token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that keeps the token and its user cached.
+
+    Entries live for ``TOKEN_CACHE_TIMEOUT`` seconds and are dropped by
+    the users signals when a token is deleted or its user is saved,
+    which covers logout, password changes and deactivation. The users
+    are cached with their counters deferred, so saving one never writes
+    a counter back. The cache must be shared by all workers, otherwise
+    a logout only reaches the worker that handled it.
+    """
+
+    def get_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').defer(
+                *(f'user__{field}' for field in USER_COUNTER_FIELDS)
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            credentials = self.get_credentials(key)
+            cache.set(cache_key, credentials, TOKEN_CACHE_TIMEOUT)
+        return credentials
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+def count_user_relations(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    for user in User.objects.annotate(
+        recipes_total=models.Count('recipes', distinct=True),
+        followers_total=models.Count('who_are_subscribed', distinct=True),
+    ).filter(
+        models.Q(recipes_total__gt=0) | models.Q(followers_total__gt=0)
+    ):
+        User.objects.filter(pk=user.pk).update(
+            recipes_count=user.recipes_total,
+            followers_count=user.followers_total,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_user_managers'),
+        ('api', '0006_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='followers count'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='recipes count'),
+        ),
+        migrations.RunPython(
+            count_user_relations, migrations.RunPython.noop
+        ),
+    ]
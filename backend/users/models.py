@@ -1,7 +1,46 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.db import models
 
 
+class UserQuerySet(models.QuerySet):
+
+    def with_subscribed(self, user):
+        """Annotate ``subscribed``: whether ``user`` follows each row."""
+        from api.models import Follow
+
+        if not user.is_authenticated:
+            return self
+        return self.annotate(
+            subscribed=models.Exists(
+                Follow.objects.filter(user=user, author=models.OuterRef('pk'))
+            )
+        )
+
+    def with_recipes_preview(self, limit):
+        """Prefetch each user's ``limit`` latest recipes as
+        ``recipes_preview``, for all users in one query.
+        """
+        from api.models import Recipe
+
+        latest = Recipe.objects.filter(
+            author=models.OuterRef('author')
+        ).order_by('-id').values('id')[:limit]
+        return self.prefetch_related(
+            models.Prefetch(
+                'recipes',
+                queryset=Recipe.objects.filter(
+                    id__in=models.Subquery(latest)
+                ).order_by('-id'),
+                to_attr='recipes_preview',
+            )
+        )
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     """User's model"""
     email = models.EmailField(
@@ -28,6 +67,18 @@ class User(AbstractUser):
         max_length=100,
         blank=True
     )
+    recipes_count = models.PositiveIntegerField(
+        'recipes count',
+        default=0,
+        editable=False,
+    )
+    followers_count = models.PositiveIntegerField(
+        'followers count',
+        default=0,
+        editable=False,
+    )
+
+    objects = UserManager()
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
@@ -1,9 +1,22 @@
+from functools import partial
+
 from rest_framework import serializers
 
-from api.models import Follow, Recipe, User
+from api.fields import ImageVariantsField
+from api.models import Recipe, User
+from api.sparse import SparseFieldsMixin
+
+RECIPES_LIMIT = 5
+
 
+def get_recipes_limit(request):
+    try:
+        return max(int(request.query_params['recipes_limit']), 0)
+    except (KeyError, ValueError):
+        return RECIPES_LIMIT
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -18,7 +31,9 @@ class UserSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         if not user.is_authenticated:
             return False
-        return obj.subscriber.filter(user=user).exists()
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
+        return obj.who_are_subscribed.filter(user=user).exists()
 
 
 class FollowRecipeSerializer(serializers.ModelSerializer):
@@ -35,17 +50,23 @@ class FollowRecipeSerializer(serializers.ModelSerializer):
 
 
 class SubRecipeSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
     is_subscribed = serializers.SerializerMethodField()
 
+    collapsed_fields = {
+        'recipes': partial(
+            serializers.SerializerMethodField, method_name='get_recipe_ids'
+        ),
+    }
+
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'first_name',
@@ -55,47 +76,24 @@ class FollowSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         if not user.is_authenticated:
             return False
-        return obj.subscriber.filter(user=user).exists()
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
+        return obj.who_are_subscribed.filter(user=user).exists()
+
+    def get_recipes_preview(self, obj):
+        recipes = getattr(obj, 'recipes_preview', None)
+        if recipes is None:
+            limit = get_recipes_limit(self.context['request'])
+            recipes = obj.recipes.all()[:limit]
+        return recipes
 
     def get_recipes(self, obj):
-        request = self.context['request']
-        limit = int(request.query_params.get('recipes_limit', 5))
-        recipes = obj.recipes.all()[:limit]
         serializer = SubRecipeSerializer(
-            recipes,
+            self.get_recipes_preview(obj),
             many=True,
-            context={'request': request},
+            context={'request': self.context['request']},
         )
         return serializer.data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.all().count()
-
-
-class SubscribeSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Follow
-        fields = ('user', 'author')
-
-    def validate(self, obj):
-        user = obj['user']
-        author = obj['author']
-        subscribed = user.subscriber.filter(author=author).exists()
-
-        if (
-            self.context.get('request').method == 'POST'
-            and (author == user or subscribed)
-        ):
-            raise serializers.ValidationError(
-                'You can not subscribe again or subs yourself'
-            )
-
-        if (
-            self.context.get('request').method == 'DELETE'
-            and not subscribed
-        ):
-            raise serializers.ValidationError(
-                'This subscribe is absent'
-            )
-        return obj
+    def get_recipe_ids(self, obj):
+        return [recipe.id for recipe in self.get_recipes_preview(obj)]
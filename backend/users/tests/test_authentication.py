@@ -0,0 +1,45 @@
+import pytest
+from rest_framework.authtoken.models import Token
+
+from api.services import update_counter
+from users.authentication import CachedTokenAuthentication
+
+ME_URL = '/api/users/me/'
+SET_PASSWORD_URL = '/api/users/set_password/'
+LOGOUT_URL = '/api/auth/token/logout/'
+
+
+@pytest.mark.django_db
+def test_set_password_keeps_counters_of_cached_user(
+    django_user_model, user, user_client, author_client,
+):
+    assert user_client.get(ME_URL).status_code == 200
+    response = author_client.post(f'/api/users/{user.id}/subscribe/')
+    assert response.status_code == 201, response.content
+    response = user_client.post(SET_PASSWORD_URL, {
+        'current_password': 'Passw0rd!x', 'new_password': 'N3wPassw0rd!',
+    })
+    assert response.status_code == 201, response.content
+    user = django_user_model.objects.get(pk=user.pk)
+    assert user.followers_count == 1
+    assert user.check_password('N3wPassw0rd!')
+
+
+@pytest.mark.django_db
+def test_saving_cached_user_does_not_write_counters(django_user_model, user):
+    key = Token.objects.create(user=user).key
+    authentication = CachedTokenAuthentication()
+    authentication.authenticate_credentials(key)
+    cached, _ = authentication.authenticate_credentials(key)
+    update_counter(django_user_model, user.pk, 'recipes_count', 3)
+    cached.first_name = 'Имя'
+    cached.save()
+    user = django_user_model.objects.get(pk=user.pk)
+    assert (user.first_name, user.recipes_count) == ('Имя', 3)
+
+
+@pytest.mark.django_db
+def test_logout_drops_cached_token(user_client):
+    assert user_client.get(ME_URL).status_code == 200
+    assert user_client.post(LOGOUT_URL).status_code == 204
+    assert user_client.get(ME_URL).status_code == 401
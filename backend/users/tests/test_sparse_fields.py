@@ -0,0 +1,83 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+USERS_URL = '/api/users/'
+SUBSCRIPTIONS_URL = '/api/users/subscriptions/'
+RECIPE_PREVIEW_FIELDS = {'id', 'name', 'image', 'image_variants',
+                         'cooking_time'}
+
+
+def get(client, url, params=None):
+    """Return the JSON body and the SQL of a request."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    queries = [query['sql'] for query in context.captured_queries]
+    return response.json(), queries
+
+
+def touches(queries, table):
+    return any(f'"{table}"' in sql for sql in queries)
+
+
+@pytest.fixture
+def subscribed(user_client, author, make_recipes):
+    recipes = make_recipes(author, 2)
+    response = user_client.post(f'{USERS_URL}{author.id}/subscribe/')
+    assert response.status_code == 201
+    return recipes
+
+
+@pytest.mark.django_db
+def test_user_list_skips_is_subscribed_when_left_out(
+    user, user_client, author, subscribed,
+):
+    full, full_queries = get(user_client, USERS_URL)
+    assert touches(full_queries, 'api_follow')
+    body, queries = get(user_client, USERS_URL, {'fields': 'id,username'})
+    assert body['results'] == [
+        {'id': user.id, 'username': user.username},
+        {'id': author.id, 'username': author.username},
+    ]
+    assert not touches(queries, 'api_follow')
+
+    body, _ = get(
+        user_client, f'{USERS_URL}{author.id}/',
+        {'fields': 'id,is_subscribed,bogus'},
+    )
+    assert body == {'id': author.id, 'is_subscribed': True}
+
+
+@pytest.mark.django_db
+def test_subscriptions_skip_the_recipe_preview_when_left_out(
+    user_client, author, subscribed,
+):
+    full, full_queries = get(user_client, SUBSCRIPTIONS_URL)
+    body, queries = get(user_client, SUBSCRIPTIONS_URL, {'fields': 'id'})
+    assert body['results'] == [{'id': author.id}]
+    assert len(queries) < len(full_queries)
+    assert touches(full_queries, 'api_recipe')
+    assert not touches(queries, 'api_recipe')
+    # is_subscribed is left out, so no EXISTS annotation either.
+    assert any('EXISTS' in sql for sql in full_queries)
+    assert not any('EXISTS' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_nested_recipes_in_subscriptions(user_client, author, subscribed):
+    ids = [recipe.id for recipe in reversed(subscribed)]
+    body, _ = get(user_client, SUBSCRIPTIONS_URL, {'fields': 'id,recipes'})
+    assert body['results'] == [{'id': author.id, 'recipes': ids}]
+
+    body, _ = get(
+        user_client, SUBSCRIPTIONS_URL,
+        {'fields': 'id', 'expand': 'recipes', 'recipes_limit': 1},
+    )
+    result, = body['results']
+    assert set(result) == {'id', 'recipes'}
+    preview, = result['recipes']
+    assert preview['id'] == ids[0]
+    assert set(preview) == RECIPE_PREVIEW_FIELDS
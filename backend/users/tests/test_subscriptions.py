@@ -0,0 +1,91 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Follow
+
+SUBSCRIPTIONS_URL = '/api/users/subscriptions/'
+
+
+def make_authors(django_user_model, prefix, count):
+    return [
+        django_user_model.objects.create_user(
+            username=f'{prefix}{number}',
+            email=f'{prefix}{number}@foodgram.ru',
+            password='Passw0rd!x',
+        )
+        for number in range(count)
+    ]
+
+
+def follow(user, authors):
+    Follow.objects.bulk_create(
+        Follow(user=user, author=author) for author in authors
+    )
+
+
+def count_queries(client, data=None):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(SUBSCRIPTIONS_URL, data)
+    assert response.status_code == 200, response.content
+    return len(context.captured_queries), response.json()
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_authors_or_recipes(
+    django_user_model, user, user_client, author, make_recipes,
+):
+    few = make_authors(django_user_model, 'few', 1)
+    many = make_authors(django_user_model, 'many', 10)
+    make_recipes(few[0], 1)
+    for number, other in enumerate(many):
+        make_recipes(other, 5, start=10 + number * 5)
+
+    follow(user, few)
+    small, _ = count_queries(user_client)
+    follow(user, many)
+    large, body = count_queries(user_client, {'limit': 20})
+    assert small == large
+    assert body['count'] == 11
+
+
+@pytest.mark.django_db
+def test_lists_authors_the_user_follows_not_their_followers(
+    django_user_model, user, user_client, author,
+):
+    follower, = make_authors(django_user_model, 'follower', 1)
+    follow(user, [author])
+    follow(follower, [user])
+    _, body = count_queries(user_client)
+    assert [row['id'] for row in body['results']] == [author.id]
+    assert body['results'][0]['is_subscribed'] is True
+
+
+@pytest.mark.django_db
+def test_is_subscribed_is_not_read_from_the_reverse_follow(
+    user, user_client, author,
+):
+    follow(author, [user])
+    response = user_client.get(f'/api/users/{author.id}/')
+    assert response.json()['is_subscribed'] is False
+    follow(user, [author])
+    response = user_client.get(f'/api/users/{author.id}/')
+    assert response.json()['is_subscribed'] is True
+
+
+@pytest.mark.django_db
+def test_recipes_preview_is_limited_and_counted(
+    user, user_client, author, make_recipes,
+):
+    recipes = make_recipes(author, 4)
+    author.recipes_count = len(recipes)
+    author.save(update_fields=['recipes_count'])
+    follow(user, [author])
+    _, body = count_queries(user_client, {'recipes_limit': 2})
+    row, = body['results']
+    assert [recipe['id'] for recipe in row['recipes']] == [
+        recipes[3].id, recipes[2].id
+    ]
+    assert row['recipes_count'] == 4
@@ -1,15 +1,21 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from djoser.serializers import SetPasswordSerializer
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from api.feed import backfill, trim
 from api.models import Follow
+from api.services import add_relation, remove_relation
+from api.sparse import Fieldset
 
 from .permissions import AllowAnyGetPost, CurrentUserOrAdmin
-from .serializers import FollowSerializer, SubscribeSerializer, UserSerializer
+from .serializers import FollowSerializer, UserSerializer, get_recipes_limit
 
 User = get_user_model()
 
@@ -19,6 +25,14 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [AllowAnyGetPost]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve') and Fieldset.from_request(
+            self.request
+        ).includes('is_subscribed'):
+            queryset = queryset.with_subscribed(self.request.user)
+        return queryset
+
     def perform_create(self, serializer):
         username = serializer.validated_data['username']
         password = serializer.validated_data['password']
@@ -47,15 +61,23 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.is_valid()
         new_password = serializer.validated_data['new_password']
         self.request.user.set_password(new_password)
-        self.request.user.save()
+        self.request.user.save(update_fields=['password'])
         return Response(data={}, status=status.HTTP_201_CREATED)
 
     @action(detail=False,
             methods=['get'],
             permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
+        fieldset = Fieldset.from_request(request)
         queryset = User.objects.filter(
-            subscriber__user=request.user).order_by('id')
+            who_are_subscribed__user=request.user
+        ).order_by('id')
+        if fieldset.includes('is_subscribed'):
+            queryset = queryset.with_subscribed(request.user)
+        if fieldset.includes('recipes'):
+            queryset = queryset.with_recipes_preview(
+                get_recipes_limit(request)
+            )
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = FollowSerializer(
@@ -71,21 +93,21 @@ class UserViewSet(viewsets.ModelViewSet):
             methods=['post', 'delete'],
             permission_classes=[IsAuthenticated])
     def subscribe(self, request, pk):
-        author = get_object_or_404(User, pk=pk)
         user = request.user
-        data = {
-            'user': user.pk,
-            'author': author.pk,
-        }
-        serializer = SubscribeSerializer(
-            data=data,
-            context={'request': request}
-        )
-        if (
-            request.method == 'POST'
-            and serializer.is_valid()
-        ):
-            Follow.objects.create(user=user, author=author)
+        counter = (User, pk, 'followers_count')
+        if request.method == 'POST':
+            author = get_object_or_404(User, pk=pk)
+            with transaction.atomic():
+                if author == user or not add_relation(
+                    Follow, counter, user=user, author=author
+                ):
+                    raise ValidationError({
+                        api_settings.NON_FIELD_ERRORS_KEY: [
+                            'You can not subscribe again or subs yourself'
+                        ]
+                    })
+                backfill(user, author)
+            author.subscribed = True
             serializer = UserSerializer(
                 author,
                 context={'request': request}
@@ -94,10 +116,13 @@ class UserViewSet(viewsets.ModelViewSet):
                 data=serializer.data,
                 status=status.HTTP_201_CREATED
             )
-        if (
-            request.method == 'DELETE'
-            and serializer.is_valid()
-        ):
-            Follow.objects.filter(user=user, author=author).delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        with transaction.atomic():
+            if not remove_relation(Follow, counter, user=user, author_id=pk):
+                get_object_or_404(User, pk=pk)
+                raise ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'This subscribe is absent'
+                    ]
+                })
+            trim(user, pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)